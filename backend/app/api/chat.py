@@ -1,136 +1,263 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 import os
-import json
+import uuid
 import asyncio
 from typing import Optional
-from langchain_qdrant import QdrantVectorStore
-from langchain_google_genai import GoogleGenerativeAIEmbeddings, ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
 
 from dotenv import load_dotenv
 
-from app.database import get_database, get_chat_history, save_chat_message
-from app.tools.stats_tools import fetch_github_stats, fetch_leetcode_stats
+from app.database import get_database, save_chat_message
+from app.chat.history_writer import chat_history_writer
+from app.chat.session_cache import session_cache, load_chat_session
+from app.chat.admission import AdmissionRejected, admission_controller
+from app.personal.context_store import context_store
+from app.chat.response_cache import response_cache, replay_chunks
+from app.chat.llm_registry import get_llm_registry, PROMPT_TEMPLATE
+from app.chat.prompt_builder import PromptBuilder, history_summarizer, CHAT_HISTORY_WINDOW
+from app.chat.streaming import (
+    SSE, MEDIA_TYPES, ClosingStreamingResponse, DisconnectWatcher, choose_transport, coalesce, encode_frame, stream_headers, stream_stats,
+)
 
 # Load environment variables
 load_dotenv()
 
 router = APIRouter()
 
+# "full" stuffs the whole knowledge base into the prompt; "local" / "qdrant"
+# embed the question and only send the top-k matching chunks.
+RETRIEVAL_MODE = os.getenv("CHAT_RETRIEVAL_MODE", "full").lower()
+RETRIEVAL_TOP_K = int(os.getenv("CHAT_RETRIEVAL_TOP_K", "6"))
+# Replay cached answers for repeated history-free questions
+RESPONSE_CACHE_ENABLED = os.getenv("CHAT_RESPONSE_CACHE", "true").lower() not in ("0", "false", "no")
+
+prompt_builder = PromptBuilder(PROMPT_TEMPLATE)
+# Background saves of partial answers, referenced so they aren't garbage-collected
+_pending_saves = set()
+
 class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = None
 
 def get_all_portfolio_data() -> str:
-    """Reads all markdown files in backend/data/ and concatenates them."""
-    data_dir = os.path.join(os.path.dirname(__file__), "..", "..", "data")
-    context_str = ""
-    
-    if not os.path.exists(data_dir):
-        return context_str
-        
-    for filename in os.listdir(data_dir):
-        if filename.endswith(".md"):
-            filepath = os.path.join(data_dir, filename)
-            try:
-                with open(filepath, "r", encoding="utf-8") as f:
-                    context_str += f"\n\n--- Source: {filename} ---\n\n"
-                    context_str += f.read()
-            except Exception as e:
-                print(f"Error reading {filepath}: {e}")
-                
-    return context_str
+    """Returns the in-memory portfolio context (all markdown files in backend/data/)."""
+    return context_store.get_context()
+
+async def get_portfolio_context(question: str) -> str:
+    """Returns the context for a question according to CHAT_RETRIEVAL_MODE."""
+    if RETRIEVAL_MODE == "full":
+        return get_all_portfolio_data()
+    # Deferred so NumPy/LangChain aren't imported unless retrieval is used
+    from app.vectorstore.retriever import get_retriever, format_chunks
+    try:
+        chunks = await get_retriever(RETRIEVAL_MODE).aretrieve(question, k=RETRIEVAL_TOP_K)
+        if chunks:
+            return format_chunks(chunks)
+    except Exception as e:
+        print(f"Retrieval failed, falling back to full context: {e}")
+    return get_all_portfolio_data()
+
+async def get_kb_version() -> str:
+    """Changes whenever data/ or the vector index (local snapshot or Qdrant collection) changes."""
+    version = f"{RETRIEVAL_MODE}:{context_store.version}"
+    if RETRIEVAL_MODE == "local":
+        from app.vectorstore.retriever import local_index_version
+        version += f":{local_index_version()}"
+    elif RETRIEVAL_MODE == "qdrant":
+        from app.vectorstore.retriever import get_retriever
+        try:
+            version += f":{await get_retriever(RETRIEVAL_MODE).index_version()}"
+        except Exception as e:
+            print(f"Error reading index version: {e}")
+            version += ":unknown"
+    return version
+
+def save_partial_answer(db, session_id: str, message: str, partial: str) -> None:
+    """Persist what was generated before the client left, outside the (cancelled) response task."""
+    if chat_history_writer.submit(db, session_id, message, partial):
+        return
+    async def save():
+        try:
+            await save_chat_message(db, session_id, message, partial)
+            session_cache.invalidate(session_id)
+        except Exception as e:
+            print(f"Error saving partial chat history: {e}")
+    task = asyncio.create_task(save())
+    _pending_saves.add(task)
+    task.add_done_callback(_pending_saves.discard)
 
 @router.post("/query")
-async def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(request: ChatRequest, http_request: Request, transport: Optional[str] = None):
+    """
+    Streams the answer as NDJSON lines ({"session_id"} then {"text"} frames),
+    or as Server-Sent Events with ?transport=sse / Accept: text/event-stream.
+    """
     try:
         # Configuration check
         if not os.getenv("GOOGLE_API_KEY"):
             raise ValueError("GOOGLE_API_KEY not found in environment variables.")
         
-        # 1. Gather comprehensive portfolio data
-        portfolio_context = get_all_portfolio_data()
-        
-        # 2. Setup LLM
-        llm = ChatGoogleGenerativeAI(model="models/gemma-3-27b-it", temperature=0.7)
+        registry = await get_llm_registry(http_request.app)
+        timings = registry.start_request()
         
-        # 3. Handle Chat History
+        # 1. Handle Chat History
         db = get_database()
         session_id = request.session_id
         if not session_id:
-            import uuid
             session_id = str(uuid.uuid4())
+        transport = choose_transport(http_request, transport)
             
-        chat_history_str = ""
-        if session_id:
-            history_msgs = await get_chat_history(db, session_id, limit=5)
-            # Format oldest to newest
-            history_msgs.reverse() 
-            for msg in history_msgs:
-                role = "User" if msg["role"] == "user" else "Assistant"
-                chat_history_str += f"{role}: {msg['content']}\n"
+        # Stored oldest to newest; older turns live in the rolling summary.
+        # Active sessions are answered from memory without a MongoDB read.
+        session = await load_chat_session(db, session_id, limit=CHAT_HISTORY_WINDOW)
+        has_history = bool(session["messages"] or session["summary"])
         
-        # 4. Construct Prompt structure
-        prompt_template = ChatPromptTemplate.from_messages([
-            ("human", """You are a helpful AI assistant representing Aryan Anand's portfolio website.
-Your objective is to answer questions about him drawing *only* from the provided portfolio context and chat history below. 
-Do not hallucinate facts outside of the provided context. If the information is not in the context, politely state that you do not have that specific information about Aryan.
-Maintain a professional, conversational, and helpful tone.
-
---- PORTFOLIO CONTEXT ---
-{context}
-
---- CONVERSATION HISTORY ---
-{chat_history}
-
---- NEW QUESTION ---
-{input}
-""")
-        ])
+        # 2. Answers only depend on the question when there is no history
+        use_cache = RESPONSE_CACHE_ENABLED and not has_history
+        kb_version = await get_kb_version() if use_cache else None
+        question_vector = None
+        if use_cache:
+            cached_answer, question_vector = await response_cache.lookup(request.message, kb_version)
+            if cached_answer is not None:
+                return ClosingStreamingResponse(
+                    replay_generator(db, session_id, request.message, cached_answer, transport),
+                    media_type=MEDIA_TYPES[transport],
+                    headers=stream_headers(transport),
+                )
         
-        from langchain_core.output_parsers import StrOutputParser
+        # 3. Cap concurrent generations; excess requests queue fairly or get a 429
+        try:
+            slot = await admission_controller.acquire(session_id)
+        except AdmissionRejected as e:
+            raise HTTPException(status_code=429, detail=e.reason, headers={"Retry-After": str(e.retry_after)})
+        timings.mark("admitted")
         
-        # Build pure chain
-        chain = prompt_template | llm | StrOutputParser()
+        # 4. Gather portfolio data (full knowledge base or retrieved chunks)
+        try:
+            portfolio_context = await get_portfolio_context(request.message)
+            prompt_inputs = prompt_builder.build(
+                portfolio_context, session["messages"], session["summary"], request.message
+            )
+        except BaseException:
+            slot.release()
+            raise
+        
+        # 5. The prompt | llm | parser chain is shared across requests
+        chain = registry.chain
+        timings.mark("setup")
         
         async def stream_generator():
             full_response = ""
+            completed = False
+            failed = False
+            stream_stats["streams"] += 1
+            watcher = DisconnectWatcher(http_request)
             
             # Send session_id first as a metadata chunk
-            yield json.dumps({"session_id": session_id}) + "\n"
+            yield encode_frame({"session_id": session_id}, transport, event="session")
+            
+            # Small LLM chunks are merged into fewer, larger frames
+            frames = coalesce(chain.astream({
+                "context": prompt_inputs["context"],
+                "chat_history": prompt_inputs["chat_history"],
+                "input": prompt_inputs["input"]
+            }))
+            try:
+                async for frame in frames:
+                    timings.mark("first_token")
+                    full_response += frame
+                    stream_stats["frames"] += 1
+                    yield encode_frame({"text": frame}, transport)
+                    if await watcher.disconnected():
+                        break
+                else:
+                    completed = True
+            except Exception as e:
+                # The model call failed; the answer is incomplete, so nothing is saved
+                failed = True
+                stream_stats["errors"] += 1
+                print(f"Error generating chat response after {len(full_response)} chars: {e}")
+            finally:
+                # Free the slot as soon as generation stops
+                slot.release()
+                if not completed and not failed:
+                    # The client went away (seen here, or the server cancelled this
+                    # generator): stop generating and keep what we have so far.
+                    stream_stats["disconnects"] += 1
+                    print(f"Chat client disconnected after {len(full_response)} chars")
+                    if full_response:
+                        save_partial_answer(db, session_id, request.message, full_response)
+                # No-op once the frames are exhausted; otherwise stops the upstream call
+                await frames.aclose()
+            if failed:
+                yield encode_frame({"error": "Failed to generate a response"}, transport, event="error")
+                return
+            if not completed:
+                return
+            
+            if transport == SSE:
+                yield encode_frame({}, transport, event="done")
             
-            # Form stream generator
-            async for chunk in chain.astream({
-                "context": portfolio_context,
-                "chat_history": chat_history_str,
-                "input": request.message
-            }):
-                full_response += chunk
-                yield json.dumps({"text": chunk}) + "\n"
+            timings.mark("done")
+            print(f"Chat timings (ms): {registry.record(timings)}")
+            
+            if use_cache:
+                await response_cache.store(request.message, kb_version, full_response, question_vector)
             
             # Save history after streaming is complete
             if session_id:
                 try:
-                    await save_chat_message(db, session_id, request.message, full_response)
+                    await chat_history_writer.save(db, session_id, request.message, full_response)
+                    history_summarizer.schedule(db, session_id, registry.llm)
                 except Exception as e:
                     print(f"Error saving chat history: {e}")
 
-        return StreamingResponse(stream_generator(), media_type="application/x-ndjson")
+        return ClosingStreamingResponse(
+            stream_generator(),
+            media_type=MEDIA_TYPES[transport],
+            headers={**stream_headers(transport), "Server-Timing": timings.server_timing()},
+            # Releases the slot even if the client left before streaming began or send() failed
+            on_close=slot.release,
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in chat endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def replay_generator(db, session_id: str, message: str, answer: str, transport: str):
+    """Streams a cached answer in the same format as a live generation."""
+    yield encode_frame({"session_id": session_id}, transport, event="session")
+    for chunk in replay_chunks(answer):
+        yield encode_frame({"text": chunk}, transport)
+    if transport == SSE:
+        yield encode_frame({}, transport, event="done")
+    try:
+        await chat_history_writer.save(db, session_id, message, answer)
+    except Exception as e:
+        print(f"Error saving chat history: {e}")
+
+@router.get("/metrics")
+async def get_chat_metrics(http_request: Request):
+    """Chat performance counters"""
+    registry = getattr(http_request.app.state, "llm_registry", None)
+    return {
+        "response_cache": response_cache.stats(),
+        "llm": registry.stats() if registry is not None else None,
+        "streaming": dict(stream_stats),
+        "history_writer": chat_history_writer.stats(),
+        "session_cache": session_cache.stats(),
+        "admission": admission_controller.stats(),
+    }
+
 @router.get("/history/{session_id}")
 async def get_history_endpoint(session_id: str):
     """Retrieve chat history for a given session"""
     try:
         db = get_database()
-        history = await get_chat_history(db, session_id, limit=50) # Fetch more for UI
-        return {"history": history}
+        session = await load_chat_session(db, session_id, limit=50) # Fetch more for UI
+        return {"history": session["messages"]}
     except Exception as e:
         print(f"Error fetching history: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,66 @@
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request
+from app.database import get_database
+from app.api.http_cache import cached_json_response
+
+router = APIRouter()
+
+# part name -> (collection, which username it is keyed by)
+DASHBOARD_PARTS = {
+    "github_stats": ("github_stats", "github"),
+    "github_repos": ("github_repos", "github"),
+    "github_heatmap": ("github_heatmap", "github"),
+    "leetcode_stats": ("leetcode_stats", "leetcode"),
+    "leetcode_heatmap": ("leetcode_heatmap", "leetcode"),
+}
+
+@router.get("/dashboard")
+async def get_cached_dashboard(
+    request: Request,
+    github_username: str = "ar586",
+    leetcode_username: str = "aryan_anand2006",
+    fields: Optional[str] = None,
+    repo_fields: Optional[str] = None,
+):
+    """
+    All cached stats in one response, read from MongoDB concurrently.
+
+    - fields: comma-separated parts to include (default: all of
+      github_stats, github_repos, github_heatmap, leetcode_stats, leetcode_heatmap)
+    - repo_fields: comma-separated keys to keep on each repo, e.g. name,html_url,stargazers_count
+    """
+    parts = [p.strip() for p in fields.split(",") if p.strip()] if fields else list(DASHBOARD_PARTS)
+    unknown = [p for p in parts if p not in DASHBOARD_PARTS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown dashboard fields: {', '.join(unknown)}")
+
+    usernames = {"github": github_username, "leetcode": leetcode_username}
+    db = get_database()
+
+    def projection(part: str) -> dict:
+        if part == "github_repos" and repo_fields:
+            keys = [k.strip() for k in repo_fields.split(",") if k.strip()]
+            return {"_id": 0, "updated_at": 1, **{f"repos.{k}": 1 for k in keys}}
+        if part.endswith("_heatmap"):
+            # Same shape as the legacy /heatmap endpoints
+            return {"_id": 0, "heatmap": 0}
+        return {"_id": 0}
+
+    docs = await asyncio.gather(*(
+        db[DASHBOARD_PARTS[part][0]].find_one(
+            {"username": usernames[DASHBOARD_PARTS[part][1]]},
+            projection(part),
+        )
+        for part in parts
+    ))
+
+    payload = dict(zip(parts, docs))
+    if "github_repos" in payload and payload["github_repos"] is not None:
+        repos_doc = payload["github_repos"]
+        payload["github_repos"] = {"repos": repos_doc.get("repos", []), "updated_at": repos_doc.get("updated_at")}
+
+    timestamps = [doc.get("updated_at") for doc in docs if doc and doc.get("updated_at")]
+    # Missing parts make the ETag fall back to a body hash
+    updated_at = max(timestamps) if timestamps and len(timestamps) == len(docs) else None
+    return cached_json_response(request, payload, updated_at)
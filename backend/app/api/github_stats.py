@@ -1,21 +1,32 @@
 from fastapi import APIRouter, HTTPException
 from app.github.stats_fetcher import GitHubStatsFetcher
+from app.cache import SWRCache
 
 router = APIRouter()
 fetcher = GitHubStatsFetcher()
 
+# TTLs/sizes are overridable via GITHUB_STATS_CACHE_TTL etc.
+stats_cache = SWRCache.from_env("github_stats", ttl=300, stale_ttl=900)
+repos_cache = SWRCache.from_env("github_repos", ttl=600, stale_ttl=1800)
+events_cache = SWRCache.from_env("github_events", ttl=120, stale_ttl=600)
+
 @router.get("/stats/{username}")
 async def get_github_stats(username: str):
-    stats = await fetcher.get_user_stats(username)
+    stats = await stats_cache.get_or_fetch(
+        username,
+        lambda: fetcher.get_user_stats(username),
+        should_cache=lambda data: "error" not in data,
+    )
     if "error" in stats:
         raise HTTPException(status_code=404, detail=stats["error"])
     return stats
 
 @router.get("/repos/{username}")
 async def get_github_repos(username: str):
+    repos = await repos_cache.get_or_fetch(username, lambda: fetcher.get_repos(username))
     return repos
 
 @router.get("/events/{username}")
 async def get_github_events(username: str):
-    events = await fetcher.get_events(username)
+    events = await events_cache.get_or_fetch(username, lambda: fetcher.get_events(username))
     return events
@@ -0,0 +1,37 @@
+from datetime import date
+from typing import Optional
+from fastapi import HTTPException, Request
+from app.database import get_database
+from app.api.http_cache import cached_json_response
+from app.heatmap import query_heatmap
+
+async def heatmap_response(request: Request, collection: str, username: str,
+                           from_date: Optional[date], to_date: Optional[date], granularity: Optional[str]):
+    """
+    Without range/granularity parameters the legacy document (raw upstream data)
+    is returned. With any of them, only the precomputed `heatmap` field is read
+    and sliced/rolled up.
+    """
+    db = get_database()
+    compact = from_date is not None or to_date is not None or granularity is not None
+    projection = {"_id": 0, "username": 1, "heatmap": 1, "updated_at": 1} if compact else {"_id": 0, "heatmap": 0}
+    doc = await db[collection].find_one({"username": username}, projection)
+    
+    if not doc:
+        raise HTTPException(status_code=404, detail="Heatmap not found. Run sync script first.")
+    
+    if not compact:
+        return cached_json_response(request, doc, doc.get("updated_at"))
+    
+    if "heatmap" not in doc:
+        raise HTTPException(status_code=404, detail="Normalised heatmap not found. Run sync script again.")
+    try:
+        result = query_heatmap(doc["heatmap"], from_date, to_date, granularity or "day")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return cached_json_response(
+        request,
+        {"username": username, **result, "updated_at": doc.get("updated_at")},
+        doc.get("updated_at"),
+    )
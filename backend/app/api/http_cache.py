@@ -0,0 +1,98 @@
+import os
+import json
+import gzip
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Optional
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+CACHED_MAX_AGE = int(os.getenv("CACHED_MAX_AGE", "300"))
+CACHED_STALE_WHILE_REVALIDATE = int(os.getenv("CACHED_STALE_WHILE_REVALIDATE", "3600"))
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+
+# Compressed bodies keyed by (etag, encoding), so a hot document is compressed once
+_compressed: "OrderedDict[tuple, bytes]" = OrderedDict()
+_COMPRESSED_MAX_ENTRIES = 64
+
+def _cache_control() -> str:
+    return f"public, max-age={CACHED_MAX_AGE}, stale-while-revalidate={CACHED_STALE_WHILE_REVALIDATE}"
+
+def _make_etag(request: Request, updated_at: Optional[datetime], body: Optional[bytes]) -> str:
+    if updated_at is not None:
+        # Synced documents only change when updated_at does
+        seed = f"{request.url.path}?{request.url.query}|{updated_at.isoformat()}".encode("utf-8")
+    else:
+        seed = body or b""
+    return '"' + hashlib.sha256(seed).hexdigest()[:32] + '"'
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        # Compressed variants carry an encoding suffix inside the quotes
+        if tag.split("-", 1)[0].strip('"') == etag.strip('"'):
+            return True
+    return False
+
+def _choose_encoding(request: Request) -> Optional[str]:
+    accept = request.headers.get("accept-encoding", "").lower()
+    if brotli is not None and "br" in accept:
+        return "br"
+    if "gzip" in accept:
+        return "gzip"
+    return None
+
+def _compress(etag: str, encoding: str, body: bytes) -> bytes:
+    key = (etag, encoding)
+    if key in _compressed:
+        _compressed.move_to_end(key)
+        return _compressed[key]
+    if encoding == "br":
+        data = brotli.compress(body, quality=5)
+    else:
+        data = gzip.compress(body, compresslevel=6)
+    _compressed[key] = data
+    while len(_compressed) > _COMPRESSED_MAX_ENTRIES:
+        _compressed.popitem(last=False)
+    return data
+
+def cached_json_response(request: Request, payload: Any, updated_at: Optional[datetime] = None) -> Response:
+    """
+    JSON response with a strong ETag, Cache-Control and optional gzip/brotli.
+
+    When `updated_at` is given the ETag is derived from it, so a matching
+    If-None-Match is answered with an empty 304 before the payload is even
+    serialised. Otherwise the ETag is the hash of the serialised body.
+    """
+    headers = {"Cache-Control": _cache_control(), "Vary": "Accept-Encoding"}
+    if_none_match = request.headers.get("if-none-match")
+
+    body = None
+    if updated_at is None:
+        body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode("utf-8")
+    etag = _make_etag(request, updated_at, body)
+
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={**headers, "ETag": etag})
+
+    if body is None:
+        body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode("utf-8")
+
+    encoding = _choose_encoding(request) if len(body) >= COMPRESS_MIN_SIZE else None
+    if encoding:
+        body = _compress(etag, encoding, body)
+        headers["Content-Encoding"] = encoding
+        etag = f'{etag[:-1]}-{encoding}"'
+
+    headers["ETag"] = etag
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,28 +1,30 @@
-from fastapi import APIRouter, HTTPException
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
 from app.database import get_database
+from app.api.http_cache import cached_json_response
+from app.api.heatmap_cached import heatmap_response
 
 router = APIRouter()
 
 @router.get("/stats/{username}")
-async def get_cached_leetcode_stats(username: str):
+async def get_cached_leetcode_stats(username: str, request: Request):
     """Get cached LeetCode stats from MongoDB"""
     db = get_database()
-    stats = await db["leetcode_stats"].find_one({"username": username})
+    stats = await db["leetcode_stats"].find_one({"username": username}, {"_id": 0})
     
     if not stats:
         raise HTTPException(status_code=404, detail="Stats not found. Run sync script first.")
     
-    stats.pop("_id", None)
-    return stats
+    return cached_json_response(request, stats, stats.get("updated_at"))
 
 @router.get("/heatmap/{username}")
-async def get_cached_leetcode_heatmap(username: str):
-    """Get cached LeetCode heatmap from MongoDB"""
-    db = get_database()
-    heatmap = await db["leetcode_heatmap"].find_one({"username": username})
-    
-    if not heatmap:
-        raise HTTPException(status_code=404, detail="Heatmap not found. Run sync script first.")
-    
-    heatmap.pop("_id", None)
-    return heatmap
+async def get_cached_leetcode_heatmap(
+    username: str,
+    request: Request,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    granularity: Optional[str] = Query(None, description="day, week, month or year"),
+):
+    """Get cached LeetCode heatmap from MongoDB, optionally sliced to a date range"""
+    return await heatmap_response(request, "leetcode_heatmap", username, from_date, to_date, granularity)
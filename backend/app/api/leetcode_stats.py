@@ -1,32 +1,75 @@
+import json
 from fastapi import APIRouter, HTTPException
 from app.leetcode.graphql_client import LeetCodeClient
+from app.cache import SWRCache
 
 router = APIRouter()
 client = LeetCodeClient()
 
+# TTLs/sizes are overridable via LEETCODE_STATS_CACHE_TTL etc.
+stats_cache = SWRCache.from_env("leetcode_stats", ttl=300, stale_ttl=900)
+heatmap_cache = SWRCache.from_env("leetcode_heatmap", ttl=600, stale_ttl=1800)
+recent_cache = SWRCache.from_env("leetcode_recent", ttl=120, stale_ttl=600)
+
+def _is_valid(data) -> bool:
+    return bool(data) and "error" not in data
+
 @router.get("/stats/{username}")
 async def get_leetcode_stats(username: str):
-    stats = await client.get_user_stats(username)
+    stats = await stats_cache.get_or_fetch(username, lambda: client.get_user_stats(username), _is_valid)
     if not stats or "error" in stats:
-        raise HTTPException(status_code=404, detail=stats.get("error", "User not found"))
+        raise HTTPException(status_code=404, detail=(stats or {}).get("error", "User not found"))
     return stats
 
 @router.get("/heatmap/{username}")
 async def get_leetcode_heatmap(username: str):
-    data = await client.get_submission_calendar(username)
+    async def fetch_calendar():
+        data = await client.get_submission_calendar(username)
+        if not data or "error" in data:
+            return data
+        # Parse the stringified JSON calendar once per fetch, not per request
+        return {"submissionCalendar": json.loads(data.get("submissionCalendar") or "{}")}
+
+    data = await heatmap_cache.get_or_fetch(username, fetch_calendar, _is_valid)
     if not data or "error" in data:
-        raise HTTPException(status_code=404, detail=data.get("error", "User not found"))
+        raise HTTPException(status_code=404, detail=(data or {}).get("error", "User not found"))
     
-    # Parse the stringified JSON calendar
-    import json
-    calendar_str = data.get("submissionCalendar", "{}")
-    calendar = json.loads(calendar_str)
-    
-    return {"submissionCalendar": calendar}
+    return data
 
 @router.get("/recent/{username}")
 async def get_leetcode_recent(username: str):
-    data = await client.get_recent_submissions(username)
+    data = await recent_cache.get_or_fetch(username, lambda: client.get_recent_submissions(username), _is_valid)
     if not data or "error" in data:
-        raise HTTPException(status_code=404, detail=data.get("error", "User not found"))
+        raise HTTPException(status_code=404, detail=(data or {}).get("error", "User not found"))
     return data
+
+profile_cache = SWRCache.from_env("leetcode_profile", ttl=300, stale_ttl=900)
+
+def _is_complete(data) -> bool:
+    # Partial profiles are served but not cached, so the next request retries the failed parts
+    return _is_valid(data) and not data.get("errors")
+
+@router.get("/profile/{username}")
+async def get_leetcode_profile(username: str):
+    """Stats, heatmap and recent submissions from a single batched GraphQL request."""
+    async def fetch_profile():
+        data = await client.get_profile(username)
+        if not data or "error" in data:
+            return data
+        # Parse the stringified JSON calendar once per fetch, not per request
+        calendar = data["submissionCalendar"]
+        return {**data, "submissionCalendar": json.loads(calendar) if calendar is not None else None}
+
+    data = await profile_cache.get_or_fetch(username, fetch_profile, _is_complete)
+    if not data or "error" in data:
+        raise HTTPException(status_code=404, detail=(data or {}).get("error", "User not found"))
+    
+    response = {
+        "username": username,
+        "stats": data["stats"],
+        "submissionCalendar": data["submissionCalendar"],
+        "recentAcSubmissionList": data["recentAcSubmissionList"],
+    }
+    if data.get("errors"):
+        response["errors"] = data["errors"]
+    return response
@@ -1,4 +1,10 @@
-from fastapi import APIRouter, HTTPException
+import json
+import base64
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from pydantic import BaseModel, HttpUrl
 from typing import Optional, List
 from datetime import datetime
@@ -24,39 +30,131 @@ class ProjectCreate(BaseModel):
     tech_stack: Optional[List[str]] = []
     featured: Optional[bool] = False
 
+class ProjectBulkItem(ProjectCreate):
+    # Defaults to the slug derived from the title, like create_project
+    project_id: Optional[str] = None
+
+PROJECT_FIELDS = {
+    "project_id", "title", "image_url", "description", "github_link",
+    "deployed_link", "tech_stack", "featured", "created_at", "updated_at",
+}
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(project: dict) -> str:
+    # Legacy projects without created_at sort after all others and page by project_id alone
+    created_at = project.get("created_at")
+    raw = json.dumps([created_at.isoformat() if created_at else None, project["project_id"]])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, project_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return (datetime.fromisoformat(created_at) if created_at is not None else None), project_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @router.get("/")
-async def get_all_projects():
-    """Get all projects"""
+async def get_all_projects(
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    tech_stack: Optional[str] = None,
+    featured: Optional[bool] = None,
+):
+    """
+    Get projects, newest first, one page at a time.
+
+    - cursor: `next_cursor` from the previous page
+    - fields: comma-separated fields to return (project_id and created_at are always included)
+    - tech_stack: comma-separated technologies; matches projects using any of them
+    - featured: only featured (true) or non-featured (false) projects
+    """
     db = get_database()
-    projects = await db["projects"].find().sort("created_at", -1).to_list(length=100)
-    
-    # Remove MongoDB _id field
-    for project in projects:
-        project.pop("_id", None)
-    
-    return {"projects": projects}
+
+    query = {}
+    if tech_stack:
+        query["tech_stack"] = {"$in": [t.strip() for t in tech_stack.split(",") if t.strip()]}
+    if featured is not None:
+        query["featured"] = featured
+    if cursor:
+        # Keyset pagination on (created_at, project_id), both descending
+        created_at, project_id = decode_cursor(cursor)
+        if created_at is None:
+            # Already into the projects without created_at (null sorts last descending)
+            query["created_at"] = None
+            query["project_id"] = {"$lt": project_id}
+        else:
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "project_id": {"$lt": project_id}},
+                {"created_at": None},
+            ]
+
+    projection = {"_id": 0}
+    if fields:
+        requested = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = requested - PROJECT_FIELDS
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        projection.update({f: 1 for f in requested | {"project_id", "created_at"}})
+
+    # One extra row tells us whether there is a next page
+    projects = await (
+        db["projects"]
+        .find(query, projection)
+        .sort([("created_at", -1), ("project_id", -1)])
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
+
+    has_more = len(projects) > limit
+    projects = projects[:limit]
+    next_cursor = encode_cursor(projects[-1]) if has_more else None
+    return {"projects": projects, "next_cursor": next_cursor}
 
 @router.get("/featured")
 async def get_featured_projects():
     """Get only featured projects"""
     db = get_database()
-    projects = await db["projects"].find({"featured": True}).sort("created_at", -1).to_list(length=10)
-    
-    for project in projects:
-        project.pop("_id", None)
+    projects = await (
+        db["projects"]
+        .find({"featured": True}, {"_id": 0})
+        .sort([("created_at", -1), ("project_id", -1)])
+        .to_list(length=10)
+    )
     
     return {"projects": projects}
 
+@router.get("/export")
+async def export_projects():
+    """Stream every project as NDJSON, one document per line, straight off the cursor."""
+    db = get_database()
+
+    async def ndjson_generator():
+        cursor = (
+            db["projects"]
+            .find({}, {"_id": 0})
+            .sort([("created_at", -1), ("project_id", -1)])
+            .batch_size(200)
+        )
+        async for project in cursor:
+            yield json.dumps(jsonable_encoder(project)) + "\n"
+
+    return StreamingResponse(
+        ndjson_generator(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=projects.ndjson"},
+    )
+
 @router.get("/{project_id}")
 async def get_project(project_id: str):
     """Get a specific project by ID"""
     db = get_database()
-    project = await db["projects"].find_one({"project_id": project_id})
+    project = await db["projects"].find_one({"project_id": project_id}, {"_id": 0})
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    project.pop("_id", None)
     return project
 
 @router.post("/")
@@ -84,6 +182,58 @@ async def create_project(project: ProjectCreate):
     
     return {"message": "Project created successfully", "project_id": project_id}
 
+@router.post("/bulk")
+async def bulk_upsert_projects(projects: List[ProjectBulkItem]):
+    """
+    Create or update many projects in one unordered bulk_write.
+    Returns a per-item status: "created", "updated" or "error".
+    """
+    if not projects:
+        return {"results": [], "created": 0, "updated": 0, "errors": 0}
+
+    db = get_database()
+    now = datetime.now()
+    operations = []
+    project_ids = []
+    for project in projects:
+        project_id = project.project_id or project.title.lower().replace(" ", "-")
+        project_ids.append(project_id)
+        fields = project.model_dump(exclude={"project_id"})
+        fields["tech_stack"] = fields.get("tech_stack") or []
+        fields["featured"] = fields.get("featured") or False
+        operations.append(UpdateOne(
+            {"project_id": project_id},
+            {
+                "$set": {**fields, "updated_at": now},
+                "$setOnInsert": {"project_id": project_id, "created_at": now},
+            },
+            upsert=True,
+        ))
+
+    write_errors = {}
+    upserted = {}
+    try:
+        result = await db["projects"].bulk_write(operations, ordered=False)
+        upserted = result.upserted_ids
+    except BulkWriteError as e:
+        details = e.details
+        write_errors = {err["index"]: err.get("errmsg", "Write error") for err in details.get("writeErrors", [])}
+        upserted = {u["index"]: u["_id"] for u in details.get("upserted", [])}
+
+    results = []
+    for i, project_id in enumerate(project_ids):
+        if i in write_errors:
+            results.append({"project_id": project_id, "status": "error", "error": write_errors[i]})
+        else:
+            results.append({"project_id": project_id, "status": "created" if i in upserted else "updated"})
+
+    return {
+        "results": results,
+        "created": sum(r["status"] == "created" for r in results),
+        "updated": sum(r["status"] == "updated" for r in results),
+        "errors": len(write_errors),
+    }
+
 @router.put("/{project_id}")
 async def update_project(project_id: str, project: ProjectCreate):
     """Update an existing project"""
@@ -0,0 +1,108 @@
+import os
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+class SWRCache:
+    """
+    Bounded, per-key TTL cache with stale-while-revalidate and single-flight.
+
+    - Fresh entries (younger than `ttl`) are returned directly.
+    - Stale entries (younger than `ttl + stale_ttl`) are returned immediately
+      while one background task refreshes them.
+    - Concurrent misses for the same key share one in-flight upstream call.
+    - At most `maxsize` keys are kept; the least recently used is evicted.
+    """
+
+    def __init__(self, name: str, ttl: float = 300, stale_ttl: float = 600, maxsize: int = 256):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @classmethod
+    def from_env(cls, name: str, ttl: float = 300, stale_ttl: float = 600, maxsize: int = 256) -> "SWRCache":
+        """Reads <NAME>_CACHE_TTL, <NAME>_CACHE_STALE_TTL and <NAME>_CACHE_MAXSIZE overrides."""
+        prefix = name.upper()
+        return cls(
+            name,
+            ttl=float(os.getenv(f"{prefix}_CACHE_TTL", ttl)),
+            stale_ttl=float(os.getenv(f"{prefix}_CACHE_STALE_TTL", stale_ttl)),
+            maxsize=int(os.getenv(f"{prefix}_CACHE_MAXSIZE", maxsize)),
+        )
+
+    def _set(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]], should_cache: Callable[[Any], bool]) -> asyncio.Future:
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return inflight
+
+        async def run():
+            try:
+                value = await fetch()
+                if should_cache(value):
+                    self._set(key, value)
+                return value
+            finally:
+                self._inflight.pop(key, None)
+
+        task = asyncio.ensure_future(run())
+        self._inflight[key] = task
+        return task
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool] = bool,
+    ) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                task = self._fetch(key, fetch, should_cache)
+                # Errors from a background refresh are dropped; the stale value stays
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                return value
+            self._entries.pop(key, None)
+
+        self.misses += 1
+        # shield() so one cancelled caller doesn't cancel the shared fetch
+        return await asyncio.shield(self._fetch(key, fetch, should_cache))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
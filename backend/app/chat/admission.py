@@ -0,0 +1,180 @@
+import os
+import math
+import time
+import asyncio
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional
+
+# Generations streaming from Gemini at once, across all sessions
+CHAT_MAX_CONCURRENT = int(os.getenv("CHAT_MAX_CONCURRENT", "8"))
+# Generations one session may have in flight
+CHAT_MAX_PER_SESSION = int(os.getenv("CHAT_MAX_PER_SESSION", "1"))
+# Requests allowed to wait for a slot; beyond this they get a 429 straight away
+CHAT_MAX_QUEUE = int(os.getenv("CHAT_MAX_QUEUE", "32"))
+# Requests one session may have waiting
+CHAT_MAX_QUEUED_PER_SESSION = int(os.getenv("CHAT_MAX_QUEUED_PER_SESSION", "2"))
+# Longest a request waits for a slot before it gets a 429
+CHAT_QUEUE_TIMEOUT = float(os.getenv("CHAT_QUEUE_TIMEOUT", "20"))
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+class Slot:
+    """A granted generation slot. release() is idempotent."""
+
+    def __init__(self, controller: "AdmissionController", session_id: str):
+        self.controller = controller
+        self.session_id = session_id
+        self.granted_at = time.perf_counter()
+        self.released = False
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self.controller._release(self)
+
+class AdmissionController:
+    """
+    Caps concurrent chat generations globally and per session.
+
+    Requests that can't start immediately wait in a bounded queue with one
+    FIFO per session; freed slots are handed out round-robin across
+    sessions, so one busy visitor can't starve the rest. When the queue is
+    full, or a request waits longer than `queue_timeout`, it is rejected
+    with a Retry-After estimate based on recent generation times.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = CHAT_MAX_CONCURRENT,
+        max_per_session: int = CHAT_MAX_PER_SESSION,
+        max_queue: int = CHAT_MAX_QUEUE,
+        max_queued_per_session: int = CHAT_MAX_QUEUED_PER_SESSION,
+        queue_timeout: float = CHAT_QUEUE_TIMEOUT,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_per_session = max_per_session
+        self.max_queue = max_queue
+        self.max_queued_per_session = max_queued_per_session
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._active_by_session: Dict[str, int] = {}
+        # session_id -> waiting futures; dict order is the round-robin order
+        self._waiting: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._queued = 0
+        self._waits: Deque[float] = deque(maxlen=500)
+        self._hold_ema: Optional[float] = None
+        self._stats = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_session_queue": 0, "rejected_timeout": 0}
+
+    async def acquire(self, session_id: str) -> Slot:
+        if not self._waiting and self._can_start(session_id):
+            self._waits.append(0.0)
+            return self._grant(session_id)
+
+        if self._queued >= self.max_queue:
+            self._stats["rejected_queue_full"] += 1
+            raise AdmissionRejected("Chat is busy, please retry shortly", self.retry_after())
+        session_queue = self._waiting.get(session_id)
+        if session_queue is not None and len(session_queue) >= self.max_queued_per_session:
+            self._stats["rejected_session_queue"] += 1
+            raise AdmissionRejected("Too many pending questions for this session", self.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(session_id, deque()).append(future)
+        self._queued += 1
+        self._stats["queued"] += 1
+        start = time.perf_counter()
+        # Slots may be free while the sessions ahead are at their own limit
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # Granted just as we gave up: hand the slot back
+                future.result().release()
+            else:
+                future.cancel()
+                self._drop_waiter(session_id, future)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._stats["rejected_timeout"] += 1
+            raise AdmissionRejected("Timed out waiting for a chat slot", self.retry_after())
+        slot = future.result()
+        self._waits.append((time.perf_counter() - start) * 1000)
+        return slot
+
+    def retry_after(self) -> int:
+        """Seconds until a queued request would likely start, at least 1."""
+        hold = self._hold_ema if self._hold_ema is not None else 5.0
+        waves = (self._queued + 1) / max(self.max_concurrent, 1)
+        return max(1, math.ceil(hold * waves))
+
+    def _can_start(self, session_id: str) -> bool:
+        return self._active < self.max_concurrent and self._active_by_session.get(session_id, 0) < self.max_per_session
+
+    def _grant(self, session_id: str) -> Slot:
+        self._active += 1
+        self._active_by_session[session_id] = self._active_by_session.get(session_id, 0) + 1
+        self._stats["admitted"] += 1
+        return Slot(self, session_id)
+
+    def _drop_waiter(self, session_id: str, future: asyncio.Future) -> None:
+        session_queue = self._waiting.get(session_id)
+        if session_queue is None or future not in session_queue:
+            return
+        session_queue.remove(future)
+        self._queued -= 1
+        if not session_queue:
+            del self._waiting[session_id]
+
+    def _release(self, slot: Slot) -> None:
+        self._active -= 1
+        remaining = self._active_by_session.get(slot.session_id, 1) - 1
+        if remaining:
+            self._active_by_session[slot.session_id] = remaining
+        else:
+            self._active_by_session.pop(slot.session_id, None)
+        hold = time.perf_counter() - slot.granted_at
+        self._hold_ema = hold if self._hold_ema is None else 0.8 * self._hold_ema + 0.2 * hold
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiting sessions, one per session per pass."""
+        progressed = True
+        while progressed and self._active < self.max_concurrent and self._waiting:
+            progressed = False
+            for session_id in list(self._waiting):
+                if self._active >= self.max_concurrent:
+                    break
+                if not self._can_start(session_id):
+                    continue
+                session_queue = self._waiting.pop(session_id)
+                future = session_queue.popleft()
+                self._queued -= 1
+                if session_queue:
+                    # Back of the rotation
+                    self._waiting[session_id] = session_queue
+                if future.done():
+                    progressed = True
+                    continue
+                future.set_result(self._grant(session_id))
+                progressed = True
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            **self._stats,
+            "active": self._active,
+            "waiting": self._queued,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+        }
+        waits = sorted(self._waits)
+        if waits:
+            for p in (50, 95, 99):
+                stats[f"wait_ms_p{p}"] = round(waits[min(len(waits) - 1, len(waits) * p // 100)], 1)
+        return stats
+
+admission_controller = AdmissionController()
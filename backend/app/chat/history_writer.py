@@ -0,0 +1,184 @@
+import os
+import time
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.database import chat_history_update, chat_turn_messages, save_chat_message
+from app.chat.session_cache import session_cache
+
+CHAT_WRITE_BATCH_SIZE = int(os.getenv("CHAT_WRITE_BATCH_SIZE", "100"))
+CHAT_WRITE_FLUSH_MS = float(os.getenv("CHAT_WRITE_FLUSH_MS", "200"))
+# When the queue is full, save() falls back to writing inline
+CHAT_WRITE_QUEUE_MAX = int(os.getenv("CHAT_WRITE_QUEUE_MAX", "10000"))
+# Longest shutdown waits for the queue to drain
+CHAT_WRITE_STOP_TIMEOUT = float(os.getenv("CHAT_WRITE_STOP_TIMEOUT", "10"))
+
+# Queued by stop(); the drain task writes everything ahead of it, then exits
+_STOP = object()
+
+class ChatHistoryWriter:
+    """
+    Write-behind queue for chat turns.
+
+    The chat endpoint enqueues a finished turn and returns; a background task
+    started in the FastAPI lifespan drains the queue and writes up to
+    `batch_size` turns per `bulk_write`, or whatever arrived within
+    `flush_ms`. Turns for the same session in one batch become a single
+    update. Everything still queued is flushed on stop(). Sessions whose
+    update fails in the bulk write are retried once with update_one.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = CHAT_WRITE_BATCH_SIZE,
+        flush_ms: float = CHAT_WRITE_FLUSH_MS,
+        max_queue: int = CHAT_WRITE_QUEUE_MAX,
+        stop_timeout: float = CHAT_WRITE_STOP_TIMEOUT,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000
+        self.max_queue = max_queue
+        self.stop_timeout = stop_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._stats = {"enqueued": 0, "written": 0, "batches": 0, "failed": 0, "retried": 0, "inline": 0, "max_depth": 0, "last_flush_ms": 0.0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping = False
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Write everything still queued (bounded by stop_timeout), then stop the drain task."""
+        if self._task is None:
+            return
+        # New turns are written inline from here on
+        self._stopping = True
+        pending = self._queue.qsize()
+        try:
+            await asyncio.wait_for(self._queue.put(_STOP), self.stop_timeout)
+            await asyncio.wait_for(self._task, self.stop_timeout)
+            if pending:
+                print(f"Flushed {pending} queued chat turns on shutdown")
+        except asyncio.TimeoutError:
+            self._task.cancel()
+            print(f"Chat history writer did not drain within {self.stop_timeout}s; "
+                  f"{self._queue.qsize()} queued turns were not written")
+        self._task = None
+
+    def submit(self, db, session_id: str, user_msg: str, ai_msg: str) -> bool:
+        """Queue a turn without awaiting; False if the writer isn't running or is full."""
+        if not session_id:
+            return True
+        if not self.running or self._stopping:
+            return False
+        messages = chat_turn_messages(user_msg, ai_msg, datetime.now())
+        try:
+            self._queue.put_nowait((db, session_id, messages))
+        except asyncio.QueueFull:
+            return False
+        # Write-through so the next turn reads this one from memory
+        session_cache.append(session_id, messages)
+        self._stats["enqueued"] += 1
+        self._stats["max_depth"] = max(self._stats["max_depth"], self._queue.qsize())
+        return True
+
+    async def save(self, db, session_id: str, user_msg: str, ai_msg: str) -> None:
+        """Queue a turn, or write it inline if it can't be queued."""
+        if not self.submit(db, session_id, user_msg, ai_msg):
+            self._stats["inline"] += 1
+            await save_chat_message(db, session_id, user_msg, ai_msg)
+            # The cached tail no longer matches MongoDB's exactly; re-read it next time
+            session_cache.invalidate(session_id)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[Any, str, list]]) -> None:
+        from pymongo import UpdateOne
+        from pymongo.errors import BulkWriteError
+
+        start = time.perf_counter()
+        # Group by database, then by session, keeping message order: session_id -> [messages, turns]
+        grouped: Dict[int, Tuple[Any, Dict[str, list]]] = {}
+        for db, session_id, messages in batch:
+            _, sessions = grouped.setdefault(id(db), (db, {}))
+            entry = sessions.setdefault(session_id, [[], 0])
+            entry[0].extend(messages)
+            entry[1] += 1
+
+        now = datetime.now()
+        for db, sessions in grouped.values():
+            updates = [
+                (session_id, chat_history_update(messages, now), turns)
+                for session_id, (messages, turns) in sessions.items()
+            ]
+            failed = list(range(len(updates)))
+            try:
+                await db["chat_history"].bulk_write(
+                    [UpdateOne({"session_id": sid}, update, upsert=True) for sid, update, _ in updates],
+                    ordered=False,
+                )
+                failed = []
+            except BulkWriteError as e:
+                # Unordered: only the reported operations failed, the rest were applied
+                failed = sorted({err["index"] for err in e.details.get("writeErrors", [])})
+                print(f"Error writing chat history batch ({len(failed)} of {len(updates)} sessions failed): {e}")
+            except Exception as e:
+                # Unknown outcome; retrying risks a duplicated turn rather than a lost one
+                print(f"Error writing chat history batch ({len(updates)} sessions): {e}")
+
+            failed_set = set(failed)
+            self._stats["written"] += sum(turns for i, (_, _, turns) in enumerate(updates) if i not in failed_set)
+            for i in failed:
+                session_id, update, turns = updates[i]
+                self._stats["retried"] += turns
+                try:
+                    await db["chat_history"].update_one({"session_id": session_id}, update, upsert=True)
+                    self._stats["written"] += turns
+                except Exception as e:
+                    self._stats["failed"] += turns
+                    session_cache.invalidate(session_id)
+                    print(f"Error writing chat history for {session_id} ({turns} turns lost): {e}")
+
+        self._stats["batches"] += 1
+        self._stats["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "running": self.running,
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "batch_size": self.batch_size,
+            "flush_ms": self.flush_interval * 1000,
+        }
+
+chat_history_writer = ChatHistoryWriter()
@@ -0,0 +1,131 @@
+import os
+import time
+import asyncio
+from collections import deque
+from typing import Any, Dict, Optional
+
+CHAT_MODEL = os.getenv("CHAT_MODEL", "models/gemma-3-27b-it")
+CHAT_TEMPERATURE = float(os.getenv("CHAT_TEMPERATURE", "0.7"))
+# "background" builds the chat stack after startup, "eager" before serving, "lazy" on first chat
+CHAT_WARMUP = os.getenv("CHAT_WARMUP", "background").lower()
+
+PROMPT_TEMPLATE = """You are a helpful AI assistant representing Aryan Anand's portfolio website.
+Your objective is to answer questions about him drawing *only* from the provided portfolio context and chat history below.
+Do not hallucinate facts outside of the provided context. If the information is not in the context, politely state that you do not have that specific information about Aryan.
+Maintain a professional, conversational, and helpful tone.
+
+--- PORTFOLIO CONTEXT ---
+{context}
+
+--- CONVERSATION HISTORY ---
+{chat_history}
+
+--- NEW QUESTION ---
+{input}
+"""
+
+class RequestTimings:
+    """Wall-clock marks for one chat request, relative to when it started."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks: Dict[str, float] = {}
+
+    def mark(self, name: str) -> None:
+        if name not in self.marks:
+            self.marks[name] = (time.perf_counter() - self.start) * 1000
+
+    def server_timing(self) -> str:
+        """Server-Timing header value for the marks recorded so far."""
+        return ", ".join(f"{name};dur={ms:.1f}" for name, ms in self.marks.items())
+
+    def summary(self) -> Dict[str, float]:
+        timings = dict(self.marks)
+        # Generation time excludes our own setup
+        if "setup" in timings and "first_token" in timings:
+            timings["llm_ttft"] = timings["first_token"] - timings["setup"]
+        return {name: round(ms, 1) for name, ms in timings.items()}
+
+class LLMRegistry:
+    """
+    The chat model, prompt template and `prompt | llm | parser` chain, built
+    once in the FastAPI lifespan and shared by all requests. LangChain
+    runnables hold no per-call state, so concurrent astream() calls are safe.
+    """
+
+    def __init__(self, model: str = CHAT_MODEL, temperature: float = CHAT_TEMPERATURE, llm: Any = None):
+        from langchain_core.prompts import ChatPromptTemplate
+        from langchain_core.output_parsers import StrOutputParser
+
+        self.model = model
+        self.temperature = temperature
+        if llm is None:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+            llm = ChatGoogleGenerativeAI(model=model, temperature=temperature)
+        self.llm = llm
+        self.prompt = ChatPromptTemplate.from_messages([("human", PROMPT_TEMPLATE)])
+        self.chain = self.prompt | self.llm | StrOutputParser()
+        self._recent = deque(maxlen=200)
+
+    def start_request(self) -> RequestTimings:
+        return RequestTimings()
+
+    def record(self, timings: RequestTimings) -> Dict[str, float]:
+        summary = timings.summary()
+        self._recent.append(summary)
+        return summary
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {"model": self.model, "temperature": self.temperature, "requests": len(self._recent)}
+        for name in ("setup", "llm_ttft", "done"):
+            values = sorted(t[name] for t in self._recent if name in t)
+            if values:
+                stats[f"{name}_ms_p50"] = values[len(values) // 2]
+                stats[f"{name}_ms_max"] = values[-1]
+        return stats
+
+def _build_chat_stack() -> LLMRegistry:
+    registry = LLMRegistry()
+    # Warm the retriever too when chat doesn't stuff the full context
+    if os.getenv("CHAT_RETRIEVAL_MODE", "full").lower() != "full":
+        from app.vectorstore.retriever import get_retriever
+        get_retriever()
+    return registry
+
+async def warm_chat_stack(app) -> Optional[LLMRegistry]:
+    """
+    Import LangChain/Gemini (and the retriever) and build the registry in a
+    worker thread, so the server accepts traffic while this happens.
+    """
+    start = time.perf_counter()
+    try:
+        registry = await asyncio.to_thread(_build_chat_stack)
+    except Exception as e:
+        print(f"Chat LLM not initialised at startup: {e}")
+        return None
+    app.state.llm_registry = registry
+    print(f"Chat stack ready in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return registry
+
+def start_chat_warmup(app) -> None:
+    app.state.llm_warmup = None
+    # A registry may already have been injected (e.g. by the benchmarks)
+    if getattr(app.state, "llm_registry", None) is not None:
+        return
+    app.state.llm_registry = None
+    if CHAT_WARMUP == "background":
+        app.state.llm_warmup = asyncio.create_task(warm_chat_stack(app))
+
+async def get_llm_registry(app) -> LLMRegistry:
+    """Returns the shared registry, waiting for the background warm-up or building it on first use."""
+    registry: Optional[LLMRegistry] = getattr(app.state, "llm_registry", None)
+    if registry is not None:
+        return registry
+    warmup = getattr(app.state, "llm_warmup", None)
+    if warmup is not None:
+        registry = await asyncio.shield(warmup)
+        if registry is not None:
+            return registry
+    registry = await asyncio.to_thread(LLMRegistry)
+    app.state.llm_registry = registry
+    return registry
@@ -0,0 +1,159 @@
+import os
+import math
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from app.database import save_chat_summary, CHAT_HISTORY_MAX_MESSAGES
+from app.chat.session_cache import session_cache, load_chat_session
+
+CHAT_PROMPT_TOKEN_BUDGET = int(os.getenv("CHAT_PROMPT_TOKEN_BUDGET", "8000"))
+# Share of the budget (after the template and question) history may use
+CHAT_HISTORY_TOKEN_SHARE = float(os.getenv("CHAT_HISTORY_TOKEN_SHARE", "0.3"))
+# Most recent messages kept verbatim; older ones get folded into the summary
+CHAT_HISTORY_WINDOW = int(os.getenv("CHAT_HISTORY_WINDOW", "6"))
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "300"))
+# Gemma's tokenizer isn't available locally; ~4 characters per token is close for English
+CHARS_PER_TOKEN = float(os.getenv("CHARS_PER_TOKEN", "4"))
+
+SOURCE_MARKER = "\n\n--- Source: "
+
+SUMMARY_PROMPT = """Update the running summary of a conversation between a visitor and the assistant of Aryan Anand's portfolio website.
+Keep facts the visitor asked about and what they were told. Be concise (at most {max_words} words) and write plain prose.
+
+Current summary:
+{summary}
+
+New messages to fold in:
+{messages}
+
+Updated summary:"""
+
+def count_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+def truncate_to_tokens(text: str, max_tokens: int, keep: str = "head") -> str:
+    """Cut text to roughly max_tokens, preferring whole '--- Source:' sections when keeping the head."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    max_chars = max(int(max_tokens * CHARS_PER_TOKEN), 0)
+    if keep == "tail":
+        return text[-max_chars:] if max_chars else ""
+    cut = text[:max_chars]
+    boundary = cut.rfind(SOURCE_MARKER)
+    return cut[:boundary] if boundary > 0 else cut
+
+def format_messages(messages: List[Dict[str, Any]]) -> str:
+    lines = []
+    for msg in messages:
+        role = "User" if msg["role"] == "user" else "Assistant"
+        lines.append(f"{role}: {msg['content']}")
+    return "\n".join(lines)
+
+class PromptBuilder:
+    """
+    Fits portfolio context and conversation history into a token budget.
+
+    History gets up to `history_share` of what's left after the template and
+    question: the rolling summary first, then the newest messages that fit,
+    oldest dropped first. Context gets the remainder and is cut at a source
+    boundary.
+    """
+
+    def __init__(self, template: str, budget: int = CHAT_PROMPT_TOKEN_BUDGET, history_share: float = CHAT_HISTORY_TOKEN_SHARE):
+        self.budget = budget
+        self.history_share = history_share
+        # Template text without its placeholders
+        self.template_tokens = count_tokens(
+            template.replace("{context}", "").replace("{chat_history}", "").replace("{input}", "")
+        )
+
+    def build(self, context: str, messages: List[Dict[str, Any]], summary: str, question: str) -> Dict[str, Any]:
+        available = max(self.budget - self.template_tokens - count_tokens(question), 0)
+
+        history_budget = int(available * self.history_share)
+        parts = []
+        used = 0
+        if summary:
+            summary_text = "Summary of earlier conversation: " + truncate_to_tokens(summary, CHAT_SUMMARY_MAX_TOKENS)
+            if count_tokens(summary_text) <= history_budget:
+                parts.append(summary_text)
+                used += count_tokens(summary_text) + 1
+        kept = []
+        for msg in reversed(messages):
+            line = format_messages([msg])
+            tokens = count_tokens(line) + 1
+            if used + tokens > history_budget:
+                break
+            kept.append(line)
+            used += tokens
+        parts.extend(reversed(kept))
+        chat_history = "\n".join(parts)
+
+        context_budget = available - count_tokens(chat_history)
+        context = truncate_to_tokens(context, context_budget)
+
+        return {
+            "context": context,
+            "chat_history": chat_history,
+            "input": question,
+            "tokens": self.template_tokens + count_tokens(context) + count_tokens(chat_history) + count_tokens(question),
+            "history_messages": len(kept),
+        }
+
+class HistorySummarizer:
+    """
+    Folds messages older than the verbatim window into a per-session rolling
+    summary stored in chat_history. Runs as a background task after each turn,
+    at most once at a time per session.
+    """
+
+    def __init__(self, window: int = CHAT_HISTORY_WINDOW, max_tokens: int = CHAT_SUMMARY_MAX_TOKENS):
+        self.window = window
+        self.max_tokens = max_tokens
+        self._running: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def schedule(self, db, session_id: str, llm) -> None:
+        if not session_id or session_id in self._running or db is None:
+            return
+        self._running.add(session_id)
+        task = asyncio.create_task(self._update(db, session_id, llm))
+        # Keep a reference so the task isn't garbage-collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _update(self, db, session_id: str, llm) -> None:
+        try:
+            # Runs after every turn, so only the newest few messages are unsummarised;
+            # reading no more than the hot-session cache holds keeps this off MongoDB
+            limit = min(CHAT_HISTORY_MAX_MESSAGES, session_cache.max_messages)
+            session = await load_chat_session(db, session_id, limit=limit)
+            messages = session["messages"]
+            cut = max(len(messages) - self.window, 0)
+            # Both messages of a turn share a timestamp; never split a turn
+            while 0 < cut < len(messages) and messages[cut].get("timestamp") == messages[cut - 1].get("timestamp"):
+                cut += 1
+            older = messages[:cut]
+            summary_until: Optional[datetime] = session["summary_until"]
+            pending = [m for m in older if summary_until is None or m.get("timestamp") > summary_until]
+            if not pending:
+                return
+
+            prompt = SUMMARY_PROMPT.format(
+                max_words=int(self.max_tokens * CHARS_PER_TOKEN / 5),
+                summary=session["summary"] or "(none yet)",
+                messages=format_messages(pending),
+            )
+            result = await llm.ainvoke(prompt)
+            summary = getattr(result, "content", result)
+            if isinstance(summary, list):
+                summary = "".join(part if isinstance(part, str) else part.get("text", "") for part in summary)
+            await save_chat_summary(db, session_id, summary.strip(), pending[-1]["timestamp"])
+            session_cache.set_summary(session_id, summary.strip(), pending[-1]["timestamp"])
+        except Exception as e:
+            print(f"Error updating chat summary for {session_id}: {e}")
+        finally:
+            self._running.discard(session_id)
+
+history_summarizer = HistorySummarizer()
@@ -0,0 +1,152 @@
+import os
+import re
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+CHAT_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "512"))
+CHAT_CACHE_TTL = float(os.getenv("CHAT_CACHE_TTL", "86400"))
+# 0 disables the embedding-similarity lookup; e.g. 0.95 matches near-identical questions
+CHAT_CACHE_SIMILARITY_THRESHOLD = float(os.getenv("CHAT_CACHE_SIMILARITY_THRESHOLD", "0"))
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", question.lower())).strip()
+
+class ResponseCache:
+    """
+    Cache of complete chat answers for history-free turns.
+
+    Entries are keyed by normalised question + knowledge-base version, so any
+    change to data/ or the vector index makes old answers unreachable (and
+    they are dropped on the next lookup). When a similarity threshold is set
+    and an embedder is provided, an exact miss falls back to the most similar
+    cached question for the same version.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CHAT_CACHE_MAX_ENTRIES,
+        ttl: float = CHAT_CACHE_TTL,
+        similarity_threshold: float = CHAT_CACHE_SIMILARITY_THRESHOLD,
+        embedder=None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.embedder = embedder
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._version: Optional[str] = None
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(question: str, kb_version: str) -> str:
+        return hashlib.sha256(f"{kb_version}\x00{normalize_question(question)}".encode("utf-8")).hexdigest()
+
+    def _check_version(self, kb_version: str) -> None:
+        if kb_version != self._version:
+            if self._entries:
+                print(f"Knowledge base changed ({self._version} -> {kb_version}); clearing {len(self._entries)} cached answers")
+            self._entries.clear()
+            self._version = kb_version
+
+    def _get_embedder(self):
+        if self.embedder is None:
+            from app.vectorstore.retriever import get_embeddings
+            self.embedder = get_embeddings()
+        return self.embedder
+
+    @staticmethod
+    def _unit(vector: List[float]):
+        # Only needed for similarity matching; keep NumPy out of startup
+        import numpy as np
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    async def lookup(self, question: str, kb_version: str) -> Tuple[Optional[str], Optional[List[float]]]:
+        """Returns (answer or None, question embedding if one was computed)."""
+        self._check_version(kb_version)
+        now = time.monotonic()
+
+        key = self._key(question, kb_version)
+        entry = self._entries.get(key)
+        if entry is not None and now - entry["stored_at"] < self.ttl:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["answer"], None
+
+        vector = None
+        if self.similarity_threshold > 0 and self._entries:
+            try:
+                vector = await self._get_embedder().aembed_query(normalize_question(question))
+            except Exception as e:
+                print(f"Response cache embedding failed: {e}")
+            if vector is not None:
+                query = self._unit(vector)
+                best_key, best_score = None, 0.0
+                for other_key, other in self._entries.items():
+                    if other.get("vector") is None or now - other["stored_at"] >= self.ttl:
+                        continue
+                    score = float(query @ other["vector"])
+                    if score > best_score:
+                        best_key, best_score = other_key, score
+                if best_key is not None and best_score >= self.similarity_threshold:
+                    self._entries.move_to_end(best_key)
+                    self.similar_hits += 1
+                    return self._entries[best_key]["answer"], vector
+
+        self.misses += 1
+        return None, vector
+
+    async def store(self, question: str, kb_version: str, answer: str, vector: Optional[List[float]] = None) -> None:
+        if not answer.strip():
+            return
+        self._check_version(kb_version)
+        if vector is None and self.similarity_threshold > 0:
+            try:
+                vector = await self._get_embedder().aembed_query(normalize_question(question))
+            except Exception as e:
+                print(f"Response cache embedding failed: {e}")
+        key = self._key(question, kb_version)
+        self._entries[key] = {
+            "answer": answer,
+            "vector": self._unit(vector) if vector is not None else None,
+            "stored_at": time.monotonic(),
+        }
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.similar_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "kb_version": self._version,
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.similar_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+def replay_chunks(answer: str, size: int = 48) -> List[str]:
+    """Split a cached answer into stream-sized pieces, breaking on spaces where possible."""
+    chunks = []
+    start = 0
+    while start < len(answer):
+        end = min(start + size, len(answer))
+        if end < len(answer):
+            space = answer.rfind(" ", start, end)
+            if space > start:
+                end = space + 1
+        chunks.append(answer[start:end])
+        start = end
+    return chunks
+
+response_cache = ResponseCache()
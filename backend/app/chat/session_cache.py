@@ -0,0 +1,168 @@
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.database import get_chat_session
+
+CHAT_SESSION_CACHE_MAX_SESSIONS = int(os.getenv("CHAT_SESSION_CACHE_MAX_SESSIONS", "1000"))
+# Rough cap on cached message text across all sessions
+CHAT_SESSION_CACHE_MAX_BYTES = int(os.getenv("CHAT_SESSION_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+# Messages kept per session (the tail of the conversation)
+CHAT_SESSION_CACHE_MESSAGES = int(os.getenv("CHAT_SESSION_CACHE_MESSAGES", "50"))
+# Reads don't extend the TTL, so a session written by another worker is re-read from MongoDB eventually
+CHAT_SESSION_CACHE_TTL = float(os.getenv("CHAT_SESSION_CACHE_TTL", "1800"))
+
+_MESSAGE_OVERHEAD = 64
+
+class _Entry:
+    __slots__ = ("messages", "summary", "summary_until", "complete", "expires", "size")
+
+    def __init__(self, messages: List[Dict[str, Any]], summary: str, summary_until: Optional[datetime], complete: bool, expires: float):
+        self.messages = messages
+        self.summary = summary
+        self.summary_until = summary_until
+        # True when `messages` is the whole stored tail, not just what this process appended
+        self.complete = complete
+        self.expires = expires
+        self.size = 0
+
+class SessionCache:
+    """
+    LRU of recently active chat sessions: the last `max_messages` messages
+    plus the rolling summary, so a follow-up question can build its prompt
+    without a MongoDB round trip.
+
+    Kept current by write-through from the chat history writer. Since every
+    turn this process handles is appended here, the newest messages of a
+    cached session are always right; a read asking for more messages than
+    were loaded from MongoDB or appended since is treated as a miss.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = CHAT_SESSION_CACHE_MAX_SESSIONS,
+        max_bytes: int = CHAT_SESSION_CACHE_MAX_BYTES,
+        max_messages: int = CHAT_SESSION_CACHE_MESSAGES,
+        ttl: float = CHAT_SESSION_CACHE_TTL,
+    ):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.max_messages = max_messages
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, session_id: str, limit: int) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(session_id)
+        if entry is None:
+            self._misses += 1
+            return None
+        if entry.expires < time.monotonic():
+            self._remove(session_id)
+            self._misses += 1
+            return None
+        if len(entry.messages) < limit and not entry.complete:
+            self._misses += 1
+            return None
+        self._entries.move_to_end(session_id)
+        self._hits += 1
+        return {
+            "messages": entry.messages[-limit:] if limit else [],
+            "summary": entry.summary,
+            "summary_until": entry.summary_until,
+        }
+
+    def load(self, session_id: str, session: Dict[str, Any], limit: int) -> None:
+        """Cache a session read from MongoDB with `limit` messages requested."""
+        if session_id in self._entries:
+            # Appends made while the read was in flight are newer than it
+            return
+        messages = session["messages"][-self.max_messages:]
+        entry = _Entry(
+            list(messages),
+            session["summary"],
+            session["summary_until"],
+            # Fewer messages than asked for means that's all there is
+            complete=len(session["messages"]) < limit,
+            expires=time.monotonic() + self.ttl,
+        )
+        self._put(session_id, entry)
+
+    def append(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        entry = self._entries.get(session_id)
+        if entry is None or entry.expires < time.monotonic():
+            # Without a loaded entry we don't know the summary; the next read goes to MongoDB
+            self.invalidate(session_id)
+            return
+        self._remove(session_id)
+        combined = entry.messages + list(messages)
+        if len(combined) > self.max_messages:
+            combined = combined[-self.max_messages:]
+            entry.complete = False
+        entry.messages = combined
+        entry.expires = time.monotonic() + self.ttl
+        self._put(session_id, entry)
+
+    def set_summary(self, session_id: str, summary: str, summary_until: datetime) -> None:
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            entry.summary = summary
+            entry.summary_until = summary_until
+            self._resize(entry)
+
+    def invalidate(self, session_id: str) -> None:
+        if session_id in self._entries:
+            self._remove(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "sessions": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def _size(self, entry: _Entry) -> int:
+        return len(entry.summary) + sum(len(m.get("content", "")) + _MESSAGE_OVERHEAD for m in entry.messages)
+
+    def _resize(self, entry: _Entry) -> None:
+        self._bytes -= entry.size
+        entry.size = self._size(entry)
+        self._bytes += entry.size
+        self._evict()
+
+    def _put(self, session_id: str, entry: _Entry) -> None:
+        entry.size = self._size(entry)
+        self._entries[session_id] = entry
+        self._bytes += entry.size
+        self._evict()
+
+    def _remove(self, session_id: str) -> None:
+        entry = self._entries.pop(session_id)
+        self._bytes -= entry.size
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_sessions or self._bytes > self.max_bytes):
+            session_id = next(iter(self._entries))
+            self._remove(session_id)
+
+session_cache = SessionCache()
+
+async def load_chat_session(db, session_id: str, limit: int) -> Dict[str, Any]:
+    """get_chat_session() that answers from the hot-session cache when it can."""
+    if not session_id:
+        return {"messages": [], "summary": "", "summary_until": None}
+    cached = session_cache.get(session_id, limit)
+    if cached is not None:
+        return cached
+    fetch = max(limit, session_cache.max_messages)
+    session = await get_chat_session(db, session_id, limit=fetch)
+    session_cache.load(session_id, session, fetch)
+    session["messages"] = session["messages"][-limit:] if limit else []
+    return session
@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+# A frame is flushed once it holds this many characters...
+CHAT_STREAM_MIN_CHARS = int(os.getenv("CHAT_STREAM_MIN_CHARS", "64"))
+# ...or once its first chunk has waited this long
+CHAT_STREAM_MAX_DELAY_MS = float(os.getenv("CHAT_STREAM_MAX_DELAY_MS", "50"))
+# How often to poll the ASGI receive channel for a disconnect while streaming
+CHAT_DISCONNECT_CHECK_MS = float(os.getenv("CHAT_DISCONNECT_CHECK_MS", "250"))
+
+NDJSON = "ndjson"
+SSE = "sse"
+MEDIA_TYPES = {NDJSON: "application/x-ndjson", SSE: "text/event-stream"}
+
+stream_stats: Dict[str, int] = {"streams": 0, "frames": 0, "chunks": 0, "disconnects": 0, "errors": 0}
+
+def choose_transport(request: Request, transport: Optional[str] = None) -> str:
+    """SSE when asked for via ?transport=sse or Accept: text/event-stream, NDJSON otherwise."""
+    if transport:
+        return SSE if transport.lower() == SSE else NDJSON
+    if "text/event-stream" in request.headers.get("accept", ""):
+        return SSE
+    return NDJSON
+
+def stream_headers(transport: str) -> Dict[str, str]:
+    headers = {"Cache-Control": "no-cache"}
+    if transport == SSE:
+        # Stop nginx-style proxies from buffering the event stream
+        headers["X-Accel-Buffering"] = "no"
+    return headers
+
+def encode_frame(payload: Dict[str, Any], transport: str, event: Optional[str] = None) -> str:
+    data = json.dumps(payload, separators=(",", ":"))
+    if transport == SSE:
+        prefix = f"event: {event}\n" if event else ""
+        return f"{prefix}data: {data}\n\n"
+    return data + "\n"
+
+async def coalesce(
+    chunks: AsyncIterator[str],
+    min_chars: int = CHAT_STREAM_MIN_CHARS,
+    max_delay_ms: float = CHAT_STREAM_MAX_DELAY_MS,
+) -> AsyncIterator[str]:
+    """
+    Merges small LLM chunks into larger frames. The first chunk is passed
+    through straight away so time-to-first-token is unchanged; later ones are
+    buffered until `min_chars` or `max_delay_ms` is reached. The next chunk is
+    awaited with a deadline, so a buffered frame goes out on time even when
+    the model pauses.
+    """
+    loop = asyncio.get_running_loop()
+    upstream = chunks.__aiter__()
+    pending: Optional[asyncio.Future] = None
+    buffer = []
+    size = 0
+    deadline: Optional[float] = None
+    first = True
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(upstream.__anext__())
+            timeout = None if deadline is None else max(deadline - loop.time(), 0)
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            if not done:
+                # The window ran out before the next chunk; keep waiting for it after flushing
+                yield "".join(buffer)
+                buffer = []
+                size = 0
+                deadline = None
+                continue
+            next_chunk, pending = pending, None
+            try:
+                chunk = next_chunk.result()
+            except StopAsyncIteration:
+                break
+            stream_stats["chunks"] += 1
+            if first:
+                first = False
+                yield chunk
+                continue
+            if not buffer:
+                deadline = loop.time() + max_delay_ms / 1000
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= min_chars or loop.time() >= deadline:
+                yield "".join(buffer)
+                buffer = []
+                size = 0
+                deadline = None
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        try:
+            if pending is not None:
+                # Let the upstream generator unwind before closing it
+                pending.cancel()
+                await asyncio.wait({pending})
+                if not pending.cancelled():
+                    # Retrieve it so an unread StopAsyncIteration/error isn't logged at GC
+                    pending.exception()
+        finally:
+            # Closing the frames closes the upstream stream, which cancels the LLM call
+            aclose = getattr(chunks, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+class ClosingStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that always closes its body generator and then runs
+    `on_close`. Starlette skips the background task and leaves the generator
+    to the garbage collector when send() raises mid-stream (e.g. an OSError
+    once the client is gone), so cleanup can't rely on either.
+    """
+
+    def __init__(self, content, *args, on_close: Optional[Callable[[], None]] = None, **kwargs):
+        super().__init__(content, *args, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            try:
+                aclose = getattr(self.body_iterator, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+            finally:
+                if self.on_close is not None:
+                    self.on_close()
+
+class DisconnectWatcher:
+    """Throttled check of Request.is_disconnected() between frames."""
+
+    def __init__(self, request: Request, interval_ms: float = CHAT_DISCONNECT_CHECK_MS):
+        self.request = request
+        self.interval = interval_ms / 1000
+        self._next_check = time.perf_counter() + self.interval
+
+    async def disconnected(self) -> bool:
+        now = time.perf_counter()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.interval
+        return await self.request.is_disconnected()
@@ -1,5 +1,6 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import asyncio
 import certifi
 from dotenv import load_dotenv
 
@@ -8,6 +9,13 @@ load_dotenv()
 MONGODB_URL = os.getenv("MONGODB_URL")
 DB_NAME = "portfolio_db"
 
+# Connection pool settings
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "50"))
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "5"))
+MONGODB_MAX_IDLE_TIME_MS = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000"))
+MONGODB_CONNECT_TIMEOUT_MS = int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "5000"))
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+
 class Database:
     def __init__(self):
         self.client = None
@@ -20,18 +28,44 @@ class Database:
             
         try:
             # Development mode: Allow invalid certificates to bypass SSL errors
-            self.client = AsyncIOMotorClient(MONGODB_URL, tlsAllowInvalidCertificates=True)
+            self.client = AsyncIOMotorClient(
+                MONGODB_URL,
+                tlsAllowInvalidCertificates=True,
+                maxPoolSize=MONGODB_MAX_POOL_SIZE,
+                minPoolSize=MONGODB_MIN_POOL_SIZE,
+                maxIdleTimeMS=MONGODB_MAX_IDLE_TIME_MS,
+                connectTimeoutMS=MONGODB_CONNECT_TIMEOUT_MS,
+                serverSelectionTimeoutMS=MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+            )
             self.db = self.client[DB_NAME]
             print("Connected to MongoDB")
         except Exception as e:
             print(f"Error connecting to MongoDB: {e}")
 
+    async def startup(self):
+        """Connect, warm the pool with a round trip and make sure indexes exist."""
+        if self.client is None:
+            self.connect()
+        if self.db is None:
+            return
+        try:
+            await self.client.admin.command("ping")
+            failed = await ensure_indexes(self.db)
+            if failed:
+                print(f"MongoDB ready (pool warmed, {len(failed)} indexes could not be created)")
+            else:
+                print("MongoDB ready (pool warmed, indexes ensured)")
+        except Exception as e:
+            print(f"Error preparing MongoDB: {e}")
+
     def get_db(self):
         return self.db
 
     def close(self):
         if self.client:
             self.client.close()
+            self.client = None
+            self.db = None
 
 db_instance = Database()
 
@@ -43,40 +77,112 @@ def get_database():
 # --- Chat History Helpers ---
 from datetime import datetime
 
+# Each session keeps at most this many messages; older ones are trimmed on write
+CHAT_HISTORY_MAX_MESSAGES = int(os.getenv("CHAT_HISTORY_MAX_MESSAGES", "100"))
+# Sessions untouched for this long are removed by MongoDB's TTL monitor
+CHAT_HISTORY_TTL_DAYS = int(os.getenv("CHAT_HISTORY_TTL_DAYS", "30"))
+
+async def ensure_indexes(db) -> list:
+    """
+    Create the indexes every read path relies on (no-op if they already exist).
+    Each index is created independently; returns the names of those that failed.
+    """
+    from pymongo import ASCENDING, DESCENDING
+
+    # (collection, keys, options)
+    specs = [
+        # Synced stats: one document per username
+        *((name, "username", {"unique": True}) for name in ("github_stats", "github_repos", "github_heatmap", "leetcode_stats", "leetcode_heatmap")),
+        ("projects", "project_id", {"unique": True}),
+        # Listing sorts on (created_at, project_id) for keyset pagination
+        ("projects", [("created_at", DESCENDING), ("project_id", DESCENDING)], {}),
+        ("projects", [("featured", ASCENDING), ("created_at", DESCENDING), ("project_id", DESCENDING)], {}),
+        ("projects", [("tech_stack", ASCENDING), ("created_at", DESCENDING), ("project_id", DESCENDING)], {}),
+        ("chat_history", "session_id", {"unique": True}),
+        ("chat_history", "updated_at", {"expireAfterSeconds": CHAT_HISTORY_TTL_DAYS * 24 * 3600}),
+    ]
+    results = await asyncio.gather(
+        *(db[collection].create_index(keys, **options) for collection, keys, options in specs),
+        return_exceptions=True,
+    )
+    failed = []
+    for (collection, keys, _), result in zip(specs, results):
+        if isinstance(result, Exception):
+            fields = keys if isinstance(keys, str) else ", ".join(field for field, _ in keys)
+            name = f"{collection}({fields})"
+            failed.append(name)
+            print(f"Error creating index {name}: {result}")
+    return failed
+
 async def get_chat_history(db, session_id: str, limit: int = 10) -> list:
     """Returns a list of message dicts: [{'role': 'user', 'content': '...'}, ...]"""
     if not session_id:
         return []
     
     collection = db["chat_history"]
-    doc = await collection.find_one({"session_id": session_id})
+    # Only the last N messages cross the wire
+    doc = await collection.find_one(
+        {"session_id": session_id},
+        {"_id": 0, "messages": {"$slice": -limit}}
+    )
     
     if not doc or "messages" not in doc:
         return []
         
-    # Return last N messages
-    return doc["messages"][-limit:]
+    return doc["messages"]
+
+async def get_chat_session(db, session_id: str, limit: int = 10) -> dict:
+    """Returns {'messages': last N messages, 'summary': rolling summary of older turns, 'summary_until': datetime}"""
+    if not session_id:
+        return {"messages": [], "summary": "", "summary_until": None}
+    
+    doc = await db["chat_history"].find_one(
+        {"session_id": session_id},
+        {"_id": 0, "messages": {"$slice": -limit}, "summary": 1, "summary_until": 1}
+    )
+    doc = doc or {}
+    return {
+        "messages": doc.get("messages", []),
+        "summary": doc.get("summary", ""),
+        "summary_until": doc.get("summary_until"),
+    }
+
+async def save_chat_summary(db, session_id: str, summary: str, summary_until: datetime):
+    """Store the rolling summary; summary_until is the timestamp of the last message folded in."""
+    await db["chat_history"].update_one(
+        {"session_id": session_id},
+        {"$set": {"summary": summary, "summary_until": summary_until}}
+    )
+
+def chat_history_update(messages: list, now: datetime) -> dict:
+    """Update document appending messages to a session (capped at CHAT_HISTORY_MAX_MESSAGES)."""
+    return {
+        "$push": {
+            "messages": {
+                "$each": messages,
+                "$slice": -CHAT_HISTORY_MAX_MESSAGES
+            }
+        },
+        "$setOnInsert": {"created_at": now},
+        "$set": {"updated_at": now}
+    }
+
+def chat_turn_messages(user_msg: str, ai_msg: str, now: datetime) -> list:
+    return [
+        {"role": "user", "content": user_msg, "timestamp": now},
+        {"role": "assistant", "content": ai_msg, "timestamp": now}
+    ]
 
 async def save_chat_message(db, session_id: str, user_msg: str, ai_msg: str):
     if not session_id:
         return
         
     collection = db["chat_history"]
+    now = datetime.now()
     
     # Update or insert
     await collection.update_one(
         {"session_id": session_id},
-        {
-            "$push": {
-                "messages": {
-                    "$each": [
-                        {"role": "user", "content": user_msg, "timestamp": datetime.now()},
-                        {"role": "assistant", "content": ai_msg, "timestamp": datetime.now()}
-                    ]
-                }
-            },
-            "$setOnInsert": {"created_at": datetime.now()},
-            "$set": {"updated_at": datetime.now()}
-        },
+        chat_history_update(chat_turn_messages(user_msg, ai_msg, now), now),
         upsert=True
     )
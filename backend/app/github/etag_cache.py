@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import httpx
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    ".cache",
+    "github",
+)
+# Responses kept (in memory and on disk); the least recently used are dropped first
+GITHUB_ETAG_CACHE_MAX_ENTRIES = int(os.getenv("GITHUB_ETAG_CACHE_MAX_ENTRIES", "500"))
+
+class ConditionalResponseCache:
+    """
+    URL-keyed cache of GitHub REST responses for conditional requests.
+
+    Stores the ETag / Last-Modified validators together with the JSON body,
+    one file per URL, so entries survive restarts and sync runs. Callers send
+    the validators back as If-None-Match / If-Modified-Since and reuse the
+    stored body on a 304, which GitHub does not count against the rate limit.
+
+    The files are read once, off the event loop, on first use. At most
+    `max_entries` URLs are kept; evicting one also deletes its file.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: int = GITHUB_ETAG_CACHE_MAX_ENTRIES):
+        self.cache_dir = cache_dir or os.getenv("GITHUB_ETAG_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _read_all(self) -> List[Dict[str, Any]]:
+        entries = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return entries
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.cache_dir, name), "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if isinstance(entry, dict) and entry.get("url"):
+                entries.append(entry)
+        entries.sort(key=lambda e: e.get("stored_at", 0))
+        return entries
+
+    async def load(self) -> None:
+        """Read the cache directory into memory, once."""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            entries = await asyncio.to_thread(self._read_all)
+            loaded: "OrderedDict[str, Dict[str, Any]]" = OrderedDict((e["url"], e) for e in entries)
+            # Anything stored while the files were being read is newer
+            loaded.update(self._entries)
+            self._entries = loaded
+            self._loaded = True
+            await self._evict()
+
+    def _remove_files(self, urls: List[str]) -> None:
+        for url in urls:
+            try:
+                os.remove(self._path(url))
+            except OSError:
+                pass
+
+    async def _evict(self) -> None:
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            url, _ = self._entries.popitem(last=False)
+            evicted.append(url)
+        if evicted:
+            await asyncio.to_thread(self._remove_files, evicted)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+        return entry
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        entry = self.get(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _write(self, url: str, entry: Dict[str, Any]) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(url)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    async def store(self, url: str, response: httpx.Response, body: Any) -> None:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": body,
+            "stored_at": time.time(),
+        }
+        self._entries[url] = entry
+        self._entries.move_to_end(url)
+        try:
+            await asyncio.to_thread(self._write, url, entry)
+        except OSError as e:
+            print(f"Error persisting GitHub cache entry for {url}: {e}")
+        await self._evict()
+
+    async def fetch_json(self, client: httpx.AsyncClient, url: str, headers: Optional[Dict[str, str]] = None):
+        """
+        GET `url` with conditional headers. Returns (status_code, body); a 304
+        is reported as 200 with the cached body.
+        """
+        await self.load()
+        request_headers = dict(headers or {})
+        request_headers.update(self.conditional_headers(url))
+        response = await client.get(url, headers=request_headers)
+
+        if response.status_code == 304:
+            entry = self.get(url)
+            if entry is not None:
+                self.hits += 1
+                return 200, entry["body"]
+            # Validators without a body shouldn't happen; retry unconditionally
+            response = await client.get(url, headers=headers)
+
+        if response.status_code != 200:
+            return response.status_code, None
+
+        self.misses += 1
+        body = response.json()
+        await self.store(url, response, body)
+        return 200, body
+
+github_response_cache = ConditionalResponseCache()
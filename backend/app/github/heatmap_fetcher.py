@@ -1,21 +1,29 @@
 import httpx
 from typing import Optional, Dict, Any
+from app.http_client import get_http_client, GITHUB_CONTRIBUTIONS_URL
 
 class GitHubHeatmapFetcher:
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        self.base_url = GITHUB_CONTRIBUTIONS_URL
+        self._client = client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return get_http_client(self.base_url, self._client)
+
     async def get_heatmap(self, username: str) -> Optional[Dict[str, Any]]:
         """
         Fetch GitHub heatmap data using public API.
         Returns JSON structure suitable for frontend rendering.
         """
         try:
-            url = f"https://github-contributions-api.jogruber.de/v4/{username}"
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url)
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    print(f"Failed to fetch GitHub heatmap: {response.status_code}")
-                    return None
+            url = f"{self.base_url}/v4/{username}"
+            response = await self.client.get(url)
+            if response.status_code == 200:
+                return response.json()
+            else:
+                print(f"Failed to fetch GitHub heatmap: {response.status_code}")
+                return None
         except Exception as e:
             print(f"Error fetching GitHub heatmap: {e}")
             return None
@@ -1,28 +1,34 @@
 import httpx
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from app.http_client import get_http_client, GITHUB_API_URL
+from app.github.etag_cache import ConditionalResponseCache, github_response_cache
 
 class GitHubStatsFetcher:
-    def __init__(self):
-        self.base_url = "https://api.github.com"
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, cache: Optional[ConditionalResponseCache] = None):
+        self.base_url = GITHUB_API_URL
+        self._client = client
+        # ETag / Last-Modified cache; 304s don't count against the rate limit
+        self.cache = cache or github_response_cache
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return get_http_client(self.base_url, self._client)
 
     async def get_user_stats(self, username: str) -> Dict[str, Any]:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.base_url}/users/{username}")
-            if response.status_code != 200:
-                return {"error": "User not found or API limits exceeded"}
-            return response.json()
+        status, data = await self.cache.fetch_json(self.client, f"{self.base_url}/users/{username}")
+        if status != 200:
+            return {"error": "User not found or API limits exceeded"}
+        return data
 
     async def get_repos(self, username: str) -> List[Dict[str, Any]]:
-        async with httpx.AsyncClient() as client:
-            # Fetch up to 100 repos (should cover most users)
-            response = await client.get(f"{self.base_url}/users/{username}/repos?per_page=100&sort=updated")
-            if response.status_code != 200:
-                return []
-            return response.json()
+        # Fetch up to 100 repos (should cover most users)
+        status, data = await self.cache.fetch_json(self.client, f"{self.base_url}/users/{username}/repos?per_page=100&sort=updated")
+        if status != 200:
+            return []
+        return data
 
     async def get_events(self, username: str, limit: int = 10) -> List[Dict[str, Any]]:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.base_url}/users/{username}/events?per_page={limit}")
-            if response.status_code != 200:
-                return []
-            return response.json()
+        status, data = await self.cache.fetch_json(self.client, f"{self.base_url}/users/{username}/events?per_page={limit}")
+        if status != 200:
+            return []
+        return data
@@ -0,0 +1,121 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+GRANULARITIES = ("day", "week", "month", "year")
+
+def _period_key(day: date, granularity: str) -> str:
+    if granularity == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    if granularity == "month":
+        return f"{day.year}-{day.month:02d}"
+    if granularity == "year":
+        return str(day.year)
+    return day.isoformat()
+
+def daily_from_github(data: Dict[str, Any]) -> Dict[date, int]:
+    """github-contributions-api v4 response -> {date: count}"""
+    daily = {}
+    for entry in (data or {}).get("contributions", []):
+        daily[date.fromisoformat(entry["date"])] = int(entry.get("count", 0))
+    return daily
+
+def daily_from_leetcode(calendar: Any) -> Dict[date, int]:
+    """LeetCode submissionCalendar ({"<unix ts>": count}, possibly stringified) -> {date: count}"""
+    if isinstance(calendar, str):
+        calendar = json.loads(calendar or "{}")
+    daily: Dict[date, int] = {}
+    for ts, count in (calendar or {}).items():
+        day = datetime.fromtimestamp(int(ts), tz=timezone.utc).date()
+        daily[day] = daily.get(day, 0) + int(count)
+    return daily
+
+def build_heatmap(daily: Dict[date, int], today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Compact, date-indexed heatmap: `counts[i]` is the count for `start + i days`,
+    with streaks and weekly/monthly/yearly totals precomputed.
+    """
+    # Calendar keys are UTC days, so "today" is too
+    today = today or datetime.now(timezone.utc).date()
+    days = [d for d in daily if d <= today]
+    if not days:
+        return {"start": None, "end": None, "counts": [], "total": 0,
+                "streaks": {"current": 0, "longest": 0},
+                "totals": {"week": {}, "month": {}, "year": {}}}
+
+    start, end = min(days), max(max(days), today)
+    counts = [0] * ((end - start).days + 1)
+    for day in days:
+        counts[(day - start).days] = daily[day]
+
+    longest = run = 0
+    for count in counts:
+        run = run + 1 if count > 0 else 0
+        longest = max(longest, run)
+
+    # Current streak may end yesterday if nothing has happened yet today
+    current = 0
+    i = len(counts) - 1
+    if counts[i] == 0:
+        i -= 1
+    while i >= 0 and counts[i] > 0:
+        current += 1
+        i -= 1
+
+    totals = {g: {} for g in ("week", "month", "year")}
+    for offset, count in enumerate(counts):
+        if not count:
+            continue
+        day = start + timedelta(days=offset)
+        for granularity, bucket in totals.items():
+            key = _period_key(day, granularity)
+            bucket[key] = bucket.get(key, 0) + count
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "counts": counts,
+        "total": sum(counts),
+        "streaks": {"current": current, "longest": longest},
+        "totals": totals,
+    }
+
+def query_heatmap(
+    heatmap: Dict[str, Any],
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    granularity: str = "day",
+) -> Dict[str, Any]:
+    """Slice a build_heatmap() document to [from_date, to_date] and roll it up."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+
+    base = {"streaks": heatmap.get("streaks"), "granularity": granularity}
+    if not heatmap.get("start"):
+        return {**base, "from": None, "to": None, "total": 0, "counts": [] if granularity == "day" else {}}
+
+    start = date.fromisoformat(heatmap["start"])
+    end = date.fromisoformat(heatmap["end"])
+    lo = max(from_date or start, start)
+    hi = min(to_date or end, end)
+    if lo > hi:
+        return {**base, "from": lo.isoformat(), "to": hi.isoformat(), "total": 0,
+                "counts": [] if granularity == "day" else {}}
+
+    window = heatmap["counts"][(lo - start).days:(hi - start).days + 1]
+    result = {**base, "from": lo.isoformat(), "to": hi.isoformat(), "total": sum(window)}
+
+    if granularity == "day":
+        result["counts"] = window
+    elif lo == start and hi == end:
+        # Full range: use the totals precomputed at sync time
+        result["counts"] = heatmap["totals"][granularity]
+    else:
+        buckets: Dict[str, int] = {}
+        for offset, count in enumerate(window):
+            if count:
+                key = _period_key(lo + timedelta(days=offset), granularity)
+                buckets[key] = buckets.get(key, 0) + count
+        result["counts"] = buckets
+    return result
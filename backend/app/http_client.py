@@ -0,0 +1,74 @@
+import os
+import httpx
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+from dotenv import load_dotenv
+
+load_dotenv()
+
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_CONTRIBUTIONS_URL = "https://github-contributions-api.jogruber.de"
+LEETCODE_URL = "https://leetcode.com"
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+
+def _http2_available() -> bool:
+    if os.getenv("HTTP2_ENABLED", "true").lower() in ("0", "false", "no"):
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class HTTPClientPool:
+    """
+    One connection-pooled httpx.AsyncClient per upstream host.
+
+    Clients are created in the FastAPI lifespan (or lazily, for scripts such
+    as sync_portfolio_data.py) and reused for every request, so keep-alive
+    connections skip the TCP+TLS handshake after the first call.
+    """
+
+    def __init__(self):
+        self.clients: Dict[str, httpx.AsyncClient] = {}
+        self.http2 = _http2_available()
+
+    def _create_client(self, host: str) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        )
+
+    def get_client(self, url: str) -> httpx.AsyncClient:
+        host = urlsplit(url).netloc or url
+        client = self.clients.get(host)
+        if client is None or client.is_closed:
+            client = self._create_client(host)
+            self.clients[host] = client
+        return client
+
+    def start(self, urls=(GITHUB_API_URL, GITHUB_CONTRIBUTIONS_URL, LEETCODE_URL)):
+        for url in urls:
+            self.get_client(url)
+        print(f"HTTP client pool ready for {len(self.clients)} hosts (http2={self.http2})")
+
+    async def close(self):
+        for client in self.clients.values():
+            await client.aclose()
+        self.clients.clear()
+
+http_pool = HTTPClientPool()
+
+def get_http_client(url: str, client: Optional[httpx.AsyncClient] = None) -> httpx.AsyncClient:
+    """Returns `client` if one was injected, otherwise the shared client for the url's host."""
+    return client if client is not None else http_pool.get_client(url)
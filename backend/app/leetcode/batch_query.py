@@ -0,0 +1,127 @@
+from typing import Dict, Any, List, Tuple
+
+# Selection sets shared with the single-operation queries in graphql_client.py
+USER_STATS_FIELDS = """
+    username
+    submitStats: submitStatsGlobal {
+        acSubmissionNum {
+            difficulty
+            count
+            submissions
+        }
+    }
+    profile {
+        ranking
+        reputation
+        realName
+        aboutMe
+        countryName
+        company
+        school
+    }
+"""
+
+CALENDAR_FIELDS = """
+    submissionCalendar
+"""
+
+RECENT_SUBMISSION_FIELDS = """
+    id
+    title
+    titleSlug
+    timestamp
+"""
+
+# operation -> (root field, selection set, extra (variable, GraphQL type) pairs)
+OPERATIONS: Dict[str, Tuple[str, str, Tuple[Tuple[str, str], ...]]] = {
+    "stats": ("matchedUser", USER_STATS_FIELDS, ()),
+    "calendar": ("matchedUser", CALENDAR_FIELDS, ()),
+    # Stats and calendar under one matchedUser alias
+    "profile": ("matchedUser", USER_STATS_FIELDS + CALENDAR_FIELDS, ()),
+    "recent": ("recentAcSubmissionList", RECENT_SUBMISSION_FIELDS, (("limit", "Int!"),)),
+}
+
+class BatchedQuery:
+    """
+    Merges several (operation, username) requests into one aliased GraphQL
+    document so they cost a single POST, then splits the response back out.
+
+        batch = BatchedQuery()
+        batch.add("stats", "alice")
+        batch.add("recent", "bob", limit=5)
+        data = await client._query(batch.document(), batch.variables())
+        results = batch.split(data)  # {("stats", "alice"): {...}, ("recent", "bob"): [...]}
+    """
+
+    def __init__(self):
+        self._items: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, operation: str, username: str, **params) -> str:
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown LeetCode operation: {operation}")
+        for item in self._items:
+            if (item["operation"], item["username"]) == (operation, username):
+                return item["alias"]
+        alias = f"{operation}_{len(self._items)}"
+        self._items.append({"alias": alias, "operation": operation, "username": username, "params": params})
+        return alias
+
+    def document(self) -> str:
+        var_defs = []
+        fields = []
+        for i, item in enumerate(self._items):
+            root, selection, extra_vars = OPERATIONS[item["operation"]]
+            args = [f"username: $username_{i}"]
+            var_defs.append(f"$username_{i}: String!")
+            for name, gql_type in extra_vars:
+                args.append(f"{name}: ${name}_{i}")
+                var_defs.append(f"${name}_{i}: {gql_type}")
+            fields.append(f"{item['alias']}: {root}({', '.join(args)}) {{{selection}}}")
+        return f"query batchedLeetCode({', '.join(var_defs)}) {{\n" + "\n".join(fields) + "\n}"
+
+    def variables(self) -> Dict[str, Any]:
+        variables = {}
+        for i, item in enumerate(self._items):
+            variables[f"username_{i}"] = item["username"]
+            for name, _ in OPERATIONS[item["operation"]][2]:
+                variables[f"{name}_{i}"] = item["params"].get(name, 15)
+        return variables
+
+    def split(self, response: Dict[str, Any]) -> Dict[Tuple[str, str], Any]:
+        """
+        Maps each (operation, username) to its result, or to {"error": ...}
+        when that alias failed. Other aliases keep their partial data. When
+        only a field inside an alias failed (GraphQL nulls just that field),
+        an object result keeps its data and lists the failures under
+        "errors" (field -> message).
+        """
+        if "error" in response:
+            return {(item["operation"], item["username"]): {"error": response["error"]} for item in self._items}
+
+        data = response.get("data") or {}
+        errors_by_alias = {}
+        field_errors: Dict[str, Dict[str, str]] = {}
+        for error in response.get("errors") or []:
+            path = error.get("path") or []
+            message = error.get("message", "Unknown error")
+            if len(path) > 1 and isinstance(data.get(path[0]), dict):
+                field_errors.setdefault(path[0], {}).setdefault(str(path[1]), message)
+            else:
+                errors_by_alias.setdefault(path[0] if path else None, message)
+
+        results = {}
+        for item in self._items:
+            key = (item["operation"], item["username"])
+            alias = item["alias"]
+            if alias in errors_by_alias:
+                results[key] = {"error": errors_by_alias[alias]}
+            elif data.get(alias) is None:
+                results[key] = {"error": errors_by_alias.get(None, "User not found")}
+            elif alias in field_errors:
+                results[key] = {**data[alias], "errors": field_errors[alias]}
+            else:
+                results[key] = data[alias]
+        return results
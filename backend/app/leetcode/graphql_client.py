@@ -1,50 +1,37 @@
 import httpx
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from app.http_client import get_http_client, LEETCODE_URL
+from app.leetcode.batch_query import BatchedQuery, USER_STATS_FIELDS, CALENDAR_FIELDS, RECENT_SUBMISSION_FIELDS
 
 class LeetCodeClient:
-    def __init__(self):
-        self.url = "https://leetcode.com/graphql"
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        self.url = f"{LEETCODE_URL}/graphql"
+        self._client = client
         self.headers = {
             "Content-Type": "application/json",
             "Referer": "https://leetcode.com",
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36"
         }
 
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return get_http_client(self.url, self._client)
+
     async def _query(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.url,
-                json={"query": query, "variables": variables},
-                headers=self.headers,
-                timeout=10.0
-            )
-            if response.status_code != 200:
-                return {"error": f"LeetCode API error: {response.status_code}"}
-            return response.json()
+        response = await self.client.post(
+            self.url,
+            json={"query": query, "variables": variables},
+            headers=self.headers,
+        )
+        if response.status_code != 200:
+            return {"error": f"LeetCode API error: {response.status_code}"}
+        return response.json()
 
     async def get_user_stats(self, username: str) -> Dict[str, Any]:
-        query = """
-        query getUserProfile($username: String!) {
-            matchedUser(username: $username) {
-                username
-                submitStats: submitStatsGlobal {
-                    acSubmissionNum {
-                        difficulty
-                        count
-                        submissions
-                    }
-                }
-                profile {
-                    ranking
-                    reputation
-                    realName
-                    aboutMe
-                    countryName
-                    company
-                    school
-                }
-            }
-        }
+        query = f"""
+        query getUserProfile($username: String!) {{
+            matchedUser(username: $username) {{{USER_STATS_FIELDS}}}
+        }}
         """
         data = await self._query(query, {"username": username})
         if "errors" in data:
@@ -52,12 +39,10 @@ class LeetCodeClient:
         return data.get("data", {}).get("matchedUser", {})
 
     async def get_submission_calendar(self, username: str) -> Dict[str, Any]:
-        query = """
-        query getSubmissionCalendar($username: String!) {
-            matchedUser(username: $username) {
-                submissionCalendar
-            }
-        }
+        query = f"""
+        query getSubmissionCalendar($username: String!) {{
+            matchedUser(username: $username) {{{CALENDAR_FIELDS}}}
+        }}
         """
         data = await self._query(query, {"username": username})
         if "errors" in data:
@@ -65,17 +50,66 @@ class LeetCodeClient:
         return data.get("data", {}).get("matchedUser", {})
 
     async def get_recent_submissions(self, username: str, limit: int = 15) -> Dict[str, Any]:
-        query = """
-        query getRecentAcSubmissions($username: String!, $limit: Int!) {
-            recentAcSubmissionList(username: $username, limit: $limit) {
-                id
-                title
-                titleSlug
-                timestamp
-            }
-        }
+        query = f"""
+        query getRecentAcSubmissions($username: String!, $limit: Int!) {{
+            recentAcSubmissionList(username: $username, limit: $limit) {{{RECENT_SUBMISSION_FIELDS}}}
+        }}
         """
         data = await self._query(query, {"username": username, "limit": limit})
         if "errors" in data:
             return {"error": data["errors"][0]["message"]}
         return data.get("data", {})
+
+    async def batch(self, requests: List[Tuple[str, str]], recent_limit: int = 15) -> Dict[Tuple[str, str], Any]:
+        """
+        Run several (operation, username) requests in one aliased GraphQL POST.
+        Operations: "stats", "calendar", "profile" (stats + calendar), "recent".
+        """
+        query = BatchedQuery()
+        for operation, username in requests:
+            query.add(operation, username, limit=recent_limit)
+        if not len(query):
+            return {}
+        data = await self._query(query.document(), query.variables())
+        return query.split(data)
+
+    async def get_profiles(self, usernames: List[str], recent_limit: int = 15) -> Dict[str, Dict[str, Any]]:
+        """
+        Stats, submission calendar and recent submissions for every user, in one round trip.
+
+        A profile whose calendar or recent submissions failed is returned with
+        those parts set to None and the messages under "errors" (part -> message),
+        so callers can tell a partial result from an empty one.
+        """
+        results = await self.batch(
+            [(operation, username) for username in usernames for operation in ("profile", "recent")],
+            recent_limit=recent_limit,
+        )
+        profiles = {}
+        for username in usernames:
+            user = results.get(("profile", username), {})
+            recent = results.get(("recent", username), {})
+            if "error" in user:
+                profiles[username] = {"error": user["error"]}
+                continue
+            field_errors = user.pop("errors", {})
+            errors = {}
+            calendar = user.pop("submissionCalendar", None)
+            if calendar is None:
+                errors["calendar"] = field_errors.get("submissionCalendar", "submissionCalendar missing from response")
+            if not isinstance(recent, list):
+                errors["recent"] = recent.get("error", "Unexpected response") if isinstance(recent, dict) else "Unexpected response"
+                recent = None
+            profile = {
+                "stats": user,
+                "submissionCalendar": calendar,
+                "recentAcSubmissionList": recent,
+            }
+            if errors:
+                profile["errors"] = errors
+            profiles[username] = profile
+        return profiles
+
+    async def get_profile(self, username: str, recent_limit: int = 15) -> Dict[str, Any]:
+        profiles = await self.get_profiles([username], recent_limit=recent_limit)
+        return profiles.get(username, {"error": "User not found"})
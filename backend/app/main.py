@@ -1,12 +1,42 @@
 import os
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import profile, github_stats, leetcode_stats, chat, projects
-from app.api import github_cached, leetcode_cached
+from app.api import github_cached, leetcode_cached, dashboard_cached
+from app.personal.context_store import context_store
+from app.http_client import http_pool
+from app.database import db_instance
+from app.chat.history_writer import chat_history_writer
+from app.chat.llm_registry import CHAT_WARMUP, start_chat_warmup, warm_chat_stack
 
-app = FastAPI(title="Portfolio Backend API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the chat context once so the first query doesn't pay for it
+    context_store.refresh(force=True)
+    # Shared, pooled upstream clients for the GitHub/LeetCode fetchers
+    http_pool.start()
+    # Connect to MongoDB up front so the first request doesn't pay for it
+    await db_instance.startup()
+    # Chat turns are written to MongoDB in batches off the request path
+    chat_history_writer.start()
+    # Chat model, prompt and chain are built once and shared by all requests.
+    # By default the heavy LangChain imports happen in the background so
+    # /health and the cached endpoints are served immediately.
+    start_chat_warmup(app)
+    if CHAT_WARMUP == "eager":
+        await warm_chat_stack(app)
+    yield
+    if app.state.llm_warmup is not None and not app.state.llm_warmup.done():
+        app.state.llm_warmup.cancel()
+    await http_pool.close()
+    # Flush queued chat turns before the Mongo client goes away
+    await chat_history_writer.stop()
+    db_instance.close()
+
+app = FastAPI(title="Portfolio Backend API", lifespan=lifespan)
 
 # Enable CORS
 app.add_middleware(
@@ -15,6 +45,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets the browser read the chat 429's retry hint
+    expose_headers=["Retry-After"],
 )
 
 app.include_router(profile.router, prefix="/api/v1/profile", tags=["profile"])
@@ -26,6 +58,7 @@ app.include_router(projects.router, prefix="/api/v1/projects", tags=["projects"]
 # Cached endpoints (read from MongoDB)
 app.include_router(github_cached.router, prefix="/api/v1/cached/github", tags=["cached-github"])
 app.include_router(leetcode_cached.router, prefix="/api/v1/cached/leetcode", tags=["cached-leetcode"])
+app.include_router(dashboard_cached.router, prefix="/api/v1/cached", tags=["cached-dashboard"])
 
 
 
@@ -0,0 +1,101 @@
+import os
+import time
+import hashlib
+import threading
+from typing import Dict, Tuple, Optional
+from app.personal.loader import PersonalKBLoader
+
+class PortfolioContextStore:
+    """
+    Keeps the concatenated portfolio knowledge base in memory.
+
+    The context string is built once (at startup) from every markdown file
+    under data/, including subdirectories such as data/repos/. Later reads
+    only do a cheap stat() sweep, at most once every `check_interval`
+    seconds, and rebuild when a file was added, removed or its content hash
+    changed.
+    """
+
+    def __init__(self, loader: Optional[PersonalKBLoader] = None, check_interval: float = None):
+        self.loader = loader or PersonalKBLoader()
+        if check_interval is None:
+            check_interval = float(os.getenv("CONTEXT_CHECK_INTERVAL", "5"))
+        self.check_interval = check_interval
+
+        self._context = ""
+        self._version = ""
+        # rel_path -> (mtime_ns, size, sha256)
+        self._files: Dict[str, Tuple[int, int, str]] = {}
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> str:
+        """Hash of all source files; changes whenever the context changes."""
+        self.get_context()
+        return self._version
+
+    def _stat_all(self) -> Dict[str, Tuple[int, int]]:
+        stats = {}
+        for rel_path in sorted(self.loader.get_all_docs()):
+            try:
+                st = os.stat(os.path.join(self.loader.data_dir, rel_path))
+            except OSError:
+                continue
+            stats[rel_path] = (st.st_mtime_ns, st.st_size)
+        return stats
+
+    def _rebuild(self, stats: Dict[str, Tuple[int, int]]) -> None:
+        files = {}
+        parts = []
+        digest = hashlib.sha256()
+        for rel_path, (mtime_ns, size) in stats.items():
+            try:
+                content = self.loader.load_file(rel_path)
+            except Exception as e:
+                print(f"Error reading {rel_path}: {e}")
+                continue
+            if content is None:
+                continue
+            content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            files[rel_path] = (mtime_ns, size, content_hash)
+            digest.update(rel_path.encode("utf-8"))
+            digest.update(content_hash.encode("utf-8"))
+            parts.append(f"\n\n--- Source: {rel_path} ---\n\n")
+            parts.append(content)
+
+        self._files = files
+        self._version = digest.hexdigest()[:16]
+        self._context = "".join(parts)
+        print(f"Portfolio context built from {len(files)} documents (version {self._version})")
+
+    def _is_stale(self, stats: Dict[str, Tuple[int, int]]) -> bool:
+        if stats.keys() != self._files.keys():
+            return True
+        for rel_path, (mtime_ns, size) in stats.items():
+            old_mtime, old_size, old_hash = self._files[rel_path]
+            if (mtime_ns, size) == (old_mtime, old_size):
+                continue
+            # Metadata changed; only rebuild if the content actually did
+            content = self.loader.load_file(rel_path) or ""
+            if hashlib.sha256(content.encode("utf-8")).hexdigest() != old_hash:
+                return True
+            self._files[rel_path] = (mtime_ns, size, old_hash)
+        return False
+
+    def refresh(self, force: bool = False) -> bool:
+        """Re-check the data directory. Returns True if the context was rebuilt."""
+        with self._lock:
+            self._last_check = time.monotonic()
+            stats = self._stat_all()
+            if force or not self._version or self._is_stale(stats):
+                self._rebuild(stats)
+                return True
+            return False
+
+    def get_context(self) -> str:
+        if not self._version or time.monotonic() - self._last_check >= self.check_interval:
+            self.refresh()
+        return self._context
+
+context_store = PortfolioContextStore()
@@ -0,0 +1,183 @@
+import os
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    ".cache",
+    "embeddings.sqlite3",
+)
+
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "3"))
+
+class EmbeddingCache:
+    """
+    Content-addressed SQLite store of embedding vectors.
+
+    Keys are sha256(model + kind + text), so the same text embedded with a
+    different model (or as a query rather than a document) never collides.
+    Vectors are stored as raw float32 blobs.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key(model: str, text: str, kind: str = "document") -> str:
+        return hashlib.sha256(f"{model}\x00{kind}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model: str, items: Dict[str, List[float]]) -> None:
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, vector, created_at) VALUES (?, ?, ?, ?)",
+                [(key, model, array("f", vector).tobytes(), now) for key, vector in items.items()],
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an Embeddings model with an EmbeddingCache. Cache misses are sent
+    to the underlying model in batches of `batch_size`, up to `concurrency`
+    batches at a time, each retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        base: Embeddings,
+        model: str,
+        cache: Optional[EmbeddingCache] = None,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        concurrency: int = EMBEDDING_CONCURRENCY,
+        max_retries: int = EMBEDDING_MAX_RETRIES,
+    ):
+        self.base = base
+        self.model = model
+        self.cache = cache or EmbeddingCache()
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.hits = 0
+        self.misses = 0
+
+    def _split(self, texts: List[str], kind: str):
+        keys = [EmbeddingCache.key(self.model, text, kind) for text in texts]
+        cached = self.cache.get_many(list(set(keys)))
+        # Embed each distinct missing text once
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        return keys, cached, missing
+
+    def _batches(self, missing: Dict[str, str]):
+        items = list(missing.items())
+        return [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+
+    def _embed_batch(self, batch) -> Dict[str, List[float]]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                vectors = self.base.embed_documents([text for _, text in batch])
+                return {key: vector for (key, _), vector in zip(batch, vectors)}
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = 2 ** attempt
+                print(f"Embedding batch failed ({e}); retrying in {delay}s...")
+                time.sleep(delay)
+
+    async def _aembed_batch(self, batch, semaphore: asyncio.Semaphore) -> Dict[str, List[float]]:
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    vectors = await self.base.aembed_documents([text for _, text in batch])
+                    return {key: vector for (key, _), vector in zip(batch, vectors)}
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        raise
+                    delay = 2 ** attempt
+                    print(f"Embedding batch failed ({e}); retrying in {delay}s...")
+                    await asyncio.sleep(delay)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, cached, missing = self._split(texts, "document")
+        if missing:
+            print(f"Embedding {len(missing)} uncached chunks ({len(texts) - len(missing)} cached)...")
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                for result in pool.map(self._embed_batch, self._batches(missing)):
+                    self.cache.put_many(self.model, result)
+                    cached.update(result)
+        return [cached[key] for key in keys]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, cached, missing = self._split(texts, "document")
+        if missing:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            results = await asyncio.gather(*(self._aembed_batch(b, semaphore) for b in self._batches(missing)))
+            for result in results:
+                self.cache.put_many(self.model, result)
+                cached.update(result)
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = EmbeddingCache.key(self.model, text, "query")
+        cached = self.cache.get_many([key])
+        if key in cached:
+            self.hits += 1
+            return cached[key]
+        self.misses += 1
+        vector = self.base.embed_query(text)
+        self.cache.put_many(self.model, {key: vector})
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = EmbeddingCache.key(self.model, text, "query")
+        cached = self.cache.get_many([key])
+        if key in cached:
+            self.hits += 1
+            return cached[key]
+        self.misses += 1
+        vector = await self.base.aembed_query(text)
+        self.cache.put_many(self.model, {key: vector})
+        return vector
@@ -1,6 +1,8 @@
 
 import os
 import sys
+import uuid
+import hashlib
 # Pre-import faiss removed
 
 # Add backend root to sys.path
@@ -10,6 +12,8 @@ if backend_root not in sys.path:
     sys.path.append(backend_root)
 
 from app.personal.loader import PersonalKBLoader
+from app.vectorstore.retriever import LocalVectorIndex, LOCAL_INDEX_PATH, COLLECTION_NAME, EMBEDDING_MODEL, chunk_set_version
+from app.vectorstore.embedding_cache import CachedEmbeddings
 from langchain_community.vectorstores import Qdrant
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_core.documents import Document
@@ -44,14 +48,119 @@ def simple_text_splitter(text: str, chunk_size: int = 500, chunk_overlap: int =
         
     return chunks
 
+def chunk_id(source: str, text: str) -> str:
+    """Stable point ID derived from (source, content hash); unchanged chunks keep their ID."""
+    content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{source}:{content_hash}"))
+
+def build_local_index(documents, ids, embeddings, path: str = LOCAL_INDEX_PATH):
+    """Write a LocalVectorIndex snapshot, re-embedding only chunks missing from the previous one."""
+    previous = {}
+    try:
+        old_index = LocalVectorIndex.load(path)
+        previous = {chunk["id"]: old_index.vectors[row] for row, chunk in enumerate(old_index.chunks)}
+    except (OSError, ValueError, KeyError):
+        pass
+
+    missing = [i for i, chunk_id in enumerate(ids) if chunk_id not in previous]
+    removed = len(set(previous) - set(ids))
+    if not missing and not removed and len(previous) == len(ids):
+        print("Local index is up to date.")
+        return
+
+    print(f"Local index: embedding {len(missing)} new chunks, dropping {removed} removed chunks...")
+    new_vectors = embeddings.embed_documents([documents[i].page_content for i in missing]) if missing else []
+    vectors_by_id = dict(previous)
+    vectors_by_id.update({ids[i]: vector for i, vector in zip(missing, new_vectors)})
+
+    chunks = [
+        {"id": chunk_id, "source": doc.metadata.get("source"), "text": doc.page_content}
+        for chunk_id, doc in zip(ids, documents)
+    ]
+    LocalVectorIndex.from_embeddings([vectors_by_id[chunk_id] for chunk_id in ids], chunks).save(path)
+    print(f"Local index saved to {path}")
+
+def sync_qdrant_index(documents, ids, embeddings):
+    """
+    Upsert new/changed chunks and delete points for removed ones. The
+    collection is never dropped, so it stays queryable during a refresh.
+    """
+    qdrant_url = os.getenv("QDRANT_URL")
+    qdrant_api_key = os.getenv("QDRANT_API_KEY")
+
+    if not qdrant_url or not qdrant_api_key:
+        print("Error: QDRANT_URL or QDRANT_API_KEY not found in environment variables.")
+        return
+
+    from langchain_qdrant import QdrantVectorStore
+    from qdrant_client import QdrantClient
+    from qdrant_client.http import models
+
+    client = QdrantClient(url=qdrant_url, api_key=qdrant_api_key)
+
+    if not client.collection_exists(COLLECTION_NAME):
+        print(f"Creating collection '{COLLECTION_NAME}' on Qdrant Cloud...")
+        client.create_collection(
+            collection_name=COLLECTION_NAME,
+            vectors_config=models.VectorParams(size=3072, distance=models.Distance.COSINE)
+        )
+
+    existing_ids = set()
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=COLLECTION_NAME,
+            limit=256,
+            offset=offset,
+            with_payload=False,
+            with_vectors=False,
+        )
+        existing_ids.update(str(point.id) for point in points)
+        if offset is None:
+            break
+
+    current_ids = set(ids)
+    to_add = [i for i, chunk_id in enumerate(ids) if chunk_id not in existing_ids]
+    to_delete = list(existing_ids - current_ids)
+    print(f"Qdrant: {len(to_add)} chunks to upsert, {len(to_delete)} to delete, "
+          f"{len(current_ids) - len(to_add)} unchanged.")
+
+    if to_add:
+        vectorstore = QdrantVectorStore(
+            client=client, 
+            collection_name=COLLECTION_NAME, 
+            embedding=embeddings
+        )
+        # One add_documents batch so CachedEmbeddings controls batching/concurrency
+        vectorstore.add_documents(
+            [documents[i] for i in to_add],
+            ids=[ids[i] for i in to_add],
+            batch_size=max(64, len(to_add)),
+        )
+
+    # Delete only after the replacements are in, so queries never see a gap
+    if to_delete:
+        client.delete(
+            collection_name=COLLECTION_NAME,
+            points_selector=models.PointIdsList(points=to_delete),
+        )
+
+    # The chat response cache keys on this, so cached answers expire with the old index
+    try:
+        client.update_collection(collection_name=COLLECTION_NAME, metadata={"index_version": chunk_set_version(ids)})
+    except Exception as e:
+        print(f"Warning: could not record the index version on the collection: {e}")
+
+    print("Index successfully synced to Qdrant Cloud!")
+
 def build_index():
     print("Initializing Google Gemini Embeddings...")
     if not os.getenv("GOOGLE_API_KEY"):
         print("Error: GOOGLE_API_KEY not found in environment variables.")
         return
 
-    # Use the requested gemini-embedding-001 model
-    embeddings = GoogleGenerativeAIEmbeddings(model="models/gemini-embedding-001")
+    # Use the requested gemini-embedding-001 model, behind the on-disk embedding cache
+    embeddings = CachedEmbeddings(GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL), EMBEDDING_MODEL)
     
     
     loader = PersonalKBLoader()
@@ -62,6 +171,8 @@ def build_index():
         return
 
     documents = []
+    ids = []
+    seen = set()
 
     print(f"Found {len(doc_names)} documents. Processing...")
     
@@ -75,6 +186,11 @@ def build_index():
         chunks = simple_text_splitter(content, chunk_size=500, chunk_overlap=50)
         
         for chunk in chunks:
+            point_id = chunk_id(doc_name, chunk)
+            if point_id in seen:
+                continue
+            seen.add(point_id)
+            ids.append(point_id)
             documents.append(Document(
                 page_content=chunk,
                 metadata={"source": doc_name}
@@ -84,36 +200,16 @@ def build_index():
         print("No content to index.")
         return
 
-    print(f"Creating index from {len(documents)} chunks...")
-    
-    qdrant_url = os.getenv("QDRANT_URL")
-    qdrant_api_key = os.getenv("QDRANT_API_KEY")
-
-    if not qdrant_url or not qdrant_api_key:
-        print("Error: QDRANT_URL or QDRANT_API_KEY not found in environment variables.")
-        return
+    print(f"Syncing index with {len(documents)} chunks...")
 
-    from langchain_qdrant import QdrantVectorStore
-    from qdrant_client import QdrantClient
-    from qdrant_client.http import models
+    # "qdrant" (default), "local" (NumPy snapshot for in-process retrieval) or "both"
+    backend = os.getenv("VECTORSTORE_BACKEND", "qdrant").lower()
+    if backend in ("local", "both"):
+        build_local_index(documents, ids, embeddings)
+    if backend in ("qdrant", "both"):
+        sync_qdrant_index(documents, ids, embeddings)
 
-    client = QdrantClient(url=qdrant_url, api_key=qdrant_api_key)
-    
-    print("Recreating collection 'portfolio_docs' on Qdrant Cloud...")
-    client.recreate_collection(
-        collection_name="portfolio_docs",
-        vectors_config=models.VectorParams(size=3072, distance=models.Distance.COSINE)
-    )
-
-    vectorstore = QdrantVectorStore(
-        client=client, 
-        collection_name="portfolio_docs", 
-        embedding=embeddings
-    )
-    
-    vectorstore.add_documents(documents)
-    
-    print("Index successfully saved to Qdrant Cloud!")
+    print(f"Embedding cache: {embeddings.hits} hits, {embeddings.misses} misses")
 
 if __name__ == "__main__":
     build_index()
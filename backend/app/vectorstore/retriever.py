@@ -0,0 +1,235 @@
+import os
+import json
+import time
+import asyncio
+import shutil
+import hashlib
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+COLLECTION_NAME = "portfolio_docs"
+EMBEDDING_MODEL = "models/gemini-embedding-001"
+LOCAL_INDEX_PATH = os.getenv(
+    "LOCAL_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "local_index"),
+)
+# Written last by LocalVectorIndex.save(); names the snapshot directory readers should use
+MANIFEST_NAME = "manifest.json"
+# Snapshots kept on disk, so a reader still loading the previous one isn't cut off
+LOCAL_INDEX_KEEP = 2
+# After a failed load, how long to wait before trying again
+RETRIEVER_RETRY_SECONDS = float(os.getenv("RETRIEVER_RETRY_SECONDS", "30"))
+# How long a Qdrant index version is reused before the collection is asked again
+QDRANT_VERSION_TTL = float(os.getenv("QDRANT_VERSION_TTL", "60"))
+
+def get_embeddings():
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+    return GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL)
+
+def _read_manifest(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, MANIFEST_NAME), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def local_index_version(path: str = LOCAL_INDEX_PATH) -> str:
+    """Version of the current snapshot, from the manifest the indexer writes last."""
+    try:
+        return _read_manifest(path)["version"]
+    except (OSError, ValueError, KeyError):
+        return "none"
+
+def chunk_set_version(ids: List[str]) -> str:
+    """Version of an indexed chunk set; chunk IDs are content hashes, so any edit changes it."""
+    return hashlib.sha1("\n".join(sorted(ids)).encode("utf-8")).hexdigest()[:16]
+
+def format_chunks(chunks: List[Dict[str, Any]]) -> str:
+    """Render retrieved chunks in the same '--- Source: x ---' layout as the full context."""
+    parts = []
+    for chunk in chunks:
+        parts.append(f"\n\n--- Source: {chunk.get('source', 'unknown')} ---\n\n")
+        parts.append(chunk.get("text", ""))
+    return "".join(parts)
+
+class LocalVectorIndex:
+    """
+    Embedded, NumPy-backed vector index.
+
+    A snapshot is a directory holding `vectors.npy` (float32, L2-normalised
+    rows) and `chunks.json` (one {"id", "source", "text"} entry per row), so
+    cosine similarity is a single matrix-vector product and no outside
+    service is needed at query time.
+
+    Each save writes a new directory under `snapshots/` and then swaps
+    `manifest.json` to point at it, so a reader sees either the old snapshot
+    or the new one, never vectors from one and chunks from the other.
+    """
+
+    def __init__(self, vectors: Optional[np.ndarray] = None, chunks: Optional[List[Dict[str, Any]]] = None, version: str = "none"):
+        self.vectors = vectors if vectors is not None else np.zeros((0, 0), dtype=np.float32)
+        self.chunks = chunks or []
+        self.version = version
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    @staticmethod
+    def _normalise(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    @classmethod
+    def from_embeddings(cls, vectors: List[List[float]], chunks: List[Dict[str, Any]]) -> "LocalVectorIndex":
+        matrix = np.asarray(vectors, dtype=np.float32)
+        return cls(cls._normalise(matrix), chunks)
+
+    @classmethod
+    def load(cls, path: str = LOCAL_INDEX_PATH) -> "LocalVectorIndex":
+        manifest = _read_manifest(path)
+        snapshot = os.path.join(path, manifest["dir"])
+        vectors = np.load(os.path.join(snapshot, "vectors.npy"), mmap_mode="r")
+        with open(os.path.join(snapshot, "chunks.json"), "r", encoding="utf-8") as f:
+            chunks = json.load(f)
+        if vectors.shape[0] != len(chunks):
+            raise ValueError(f"Snapshot {manifest['version']} has {vectors.shape[0]} vectors for {len(chunks)} chunks")
+        return cls(np.asarray(vectors, dtype=np.float32), chunks, version=manifest["version"])
+
+    def save(self, path: str = LOCAL_INDEX_PATH) -> None:
+        version = f"{time.time_ns()}-{chunk_set_version([c['id'] for c in self.chunks])}"
+        snapshot_dir = os.path.join("snapshots", version)
+        snapshot = os.path.join(path, snapshot_dir)
+        os.makedirs(snapshot)
+        np.save(os.path.join(snapshot, "vectors.npy"), self.vectors.astype(np.float32))
+        with open(os.path.join(snapshot, "chunks.json"), "w", encoding="utf-8") as f:
+            json.dump(self.chunks, f)
+
+        # The manifest is the commit point: replaced in one step, after the snapshot is complete
+        tmp_manifest = os.path.join(path, MANIFEST_NAME + ".tmp")
+        with open(tmp_manifest, "w", encoding="utf-8") as f:
+            json.dump({"version": version, "dir": snapshot_dir, "chunks": len(self.chunks)}, f)
+        os.replace(tmp_manifest, os.path.join(path, MANIFEST_NAME))
+        self.version = version
+
+        snapshots_root = os.path.join(path, "snapshots")
+        for old in sorted(os.listdir(snapshots_root))[:-LOCAL_INDEX_KEEP]:
+            shutil.rmtree(os.path.join(snapshots_root, old), ignore_errors=True)
+
+    def search(self, query_vector: List[float], k: int = 6) -> List[Dict[str, Any]]:
+        if not len(self):
+            return []
+        query = self._normalise(np.asarray(query_vector, dtype=np.float32))
+        scores = self.vectors @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [{**self.chunks[i], "score": float(scores[i])} for i in top]
+
+class LocalRetriever:
+    def __init__(self, path: str = LOCAL_INDEX_PATH, embeddings=None):
+        self.path = path
+        self.embeddings = embeddings or get_embeddings()
+        self._failed_version: Optional[str] = None
+        self._failed_at = 0.0
+        self._load()
+
+    def _load(self):
+        self.index = LocalVectorIndex.load(self.path)
+        # The version of what was actually read, not of whatever the manifest says now
+        self.version = self.index.version
+        self._failed_version = None
+        print(f"Loaded local vector index {self.version} with {len(self.index)} chunks from {self.path}")
+
+    def _maybe_reload(self):
+        current = local_index_version(self.path)
+        if current == self.version:
+            return
+        if current == self._failed_version and time.monotonic() - self._failed_at < RETRIEVER_RETRY_SECONDS:
+            return
+        try:
+            self._load()
+        except (OSError, ValueError, KeyError) as e:
+            # Keep serving the snapshot we have; retry this one after RETRIEVER_RETRY_SECONDS
+            self._failed_version = current
+            self._failed_at = time.monotonic()
+            print(f"Error loading local vector index {current}, keeping {self.version}: {e}")
+
+    async def aretrieve(self, question: str, k: int = 6) -> List[Dict[str, Any]]:
+        # Pick up a snapshot rewritten by the indexer
+        self._maybe_reload()
+        query_vector = await self.embeddings.aembed_query(question)
+        # Search is CPU-bound but tiny; keep it off the event loop anyway
+        return await asyncio.to_thread(self.index.search, query_vector, k)
+
+class QdrantRetriever:
+    def __init__(self, embeddings=None):
+        from langchain_qdrant import QdrantVectorStore
+        from qdrant_client import QdrantClient
+
+        qdrant_url = os.getenv("QDRANT_URL")
+        qdrant_api_key = os.getenv("QDRANT_API_KEY")
+        if not qdrant_url:
+            raise ValueError("QDRANT_URL not found in environment variables.")
+
+        self.embeddings = embeddings or get_embeddings()
+        self.client = QdrantClient(url=qdrant_url, api_key=qdrant_api_key)
+        self.vectorstore = QdrantVectorStore(
+            client=self.client,
+            collection_name=COLLECTION_NAME,
+            embedding=self.embeddings,
+        )
+        self._version: Optional[str] = None
+        self._version_checked = 0.0
+
+    def _read_version(self) -> str:
+        info = self.client.get_collection(COLLECTION_NAME)
+        metadata = getattr(info.config, "metadata", None) or {}
+        if metadata.get("index_version"):
+            return metadata["index_version"]
+        # Servers without collection metadata: the point count is the best signal left
+        return f"points-{info.points_count}"
+
+    async def index_version(self) -> str:
+        """The version the indexer recorded on the collection, re-read at most every QDRANT_VERSION_TTL seconds."""
+        now = time.monotonic()
+        if self._version is None or now - self._version_checked > QDRANT_VERSION_TTL:
+            self._version_checked = now
+            try:
+                self._version = await asyncio.to_thread(self._read_version)
+            except Exception as e:
+                print(f"Error reading Qdrant index version: {e}")
+        return self._version or "unknown"
+
+    async def aretrieve(self, question: str, k: int = 6) -> List[Dict[str, Any]]:
+        results = await self.vectorstore.asimilarity_search_with_score(question, k=k)
+        return [
+            {"source": doc.metadata.get("source", "unknown"), "text": doc.page_content, "score": float(score)}
+            for doc, score in results
+        ]
+
+_retrievers: Dict[str, Any] = {}
+# mode -> (monotonic time of the failure, the error), so a broken index isn't re-opened on every request
+_retriever_failures: Dict[str, Any] = {}
+
+def get_retriever(mode: Optional[str] = None):
+    """
+    Returns the shared retriever for `mode` ("local" or "qdrant").
+    Defaults to the CHAT_RETRIEVAL_MODE environment variable. If creating it
+    fails, the error is re-raised without retrying for RETRIEVER_RETRY_SECONDS.
+    """
+    mode = (mode or os.getenv("CHAT_RETRIEVAL_MODE", "full")).lower()
+    if mode not in _retrievers:
+        failure = _retriever_failures.get(mode)
+        if failure is not None and time.monotonic() - failure[0] < RETRIEVER_RETRY_SECONDS:
+            raise failure[1]
+        try:
+            if mode == "local":
+                _retrievers[mode] = LocalRetriever()
+            elif mode == "qdrant":
+                _retrievers[mode] = QdrantRetriever()
+            else:
+                raise ValueError(f"Unknown retrieval mode: {mode}")
+        except Exception as e:
+            _retriever_failures[mode] = (time.monotonic(), e)
+            raise
+        _retriever_failures.pop(mode, None)
+    return _retrievers[mode]
@@ -0,0 +1,420 @@
+"""
+Offline load test for every API route.
+
+Boots app.main:app in-process, with nothing external behind it:
+  - MongoDB is an in-memory double (db_instance.client / db_instance.db)
+  - GitHub, github-contributions and LeetCode are httpx.MockTransport fakes
+    installed in http_pool.clients
+  - Gemini is a deterministic streaming fake (app.state.llm_registry)
+The database is seeded through the real sync code and synthetic projects.
+
+Each scenario sends --requests requests from --concurrency workers straight
+to the ASGI app. It reports throughput, p50/p95/p99 latency and, for chat,
+time to the first text chunk (TTFC). Live GitHub/LeetCode routes are
+measured as they run in production: after the first fetch they hit the
+SWR cache.
+
+Usage (from backend/):
+    python benchmarks/api_load.py [--concurrency 16] [--requests 200]
+        [--only chat] [--json report.json] [--baseline benchmarks/baseline.json]
+
+Record a baseline with --json benchmarks/baseline.json and commit it. Later
+runs with --baseline print the regressions (p95 latency or throughput worse
+by more than --tolerance) and exit with status 1 if there are any.
+
+Reports record the environment (Python, platform, CPU count, key package
+versions) and `calibration_ms`, the time of a fixed CPU-bound workload.
+On a slower machine (or CI) the baseline numbers are scaled by the ratio
+of the two calibrations before comparing, so the check still means
+something there; on a faster one they are used as recorded. The simulated
+upstream/LLM delays don't scale with the CPU, so treat the scaled
+comparison as approximate and re-record the baseline when the hardware
+changes a lot.
+"""
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import platform
+import tempfile
+import contextlib
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Must be set before the app modules read them
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("CHAT_RETRIEVAL_MODE", "full")
+os.environ.setdefault("GITHUB_ETAG_CACHE_DIR", os.path.join(tempfile.gettempdir(), "portfolio-bench-etags"))
+
+GITHUB_USER = "ar586"
+LEETCODE_USER = "aryan_anand2006"
+SEED_PROJECTS = 300
+
+class Scenario:
+    """One route under load. `build(i, worker)` returns (path, json body or None, headers)."""
+
+    def __init__(self, name: str, method: str, build: Callable[[int, int], Tuple[str, Any, Dict[str, str]]], chat: bool = False):
+        self.name = name
+        self.method = method
+        self.build = build
+        self.chat = chat
+
+def _get(path: str) -> Callable[[int, int], Tuple[str, Any, Dict[str, str]]]:
+    return lambda i, worker: (path, None, {})
+
+def build_scenarios(first_project_page_cursor: str) -> List[Scenario]:
+    project = {"title": "Bench Project", "description": "Benchmark project", "tech_stack": ["Python"], "featured": False}
+    bulk = [
+        {**project, "title": f"Bulk Project {n}", "project_id": f"bulk-project-{n}"}
+        for n in range(20)
+    ]
+    return [
+        Scenario("health", "GET", _get("/health")),
+        Scenario("profile_list", "GET", _get("/api/v1/profile/")),
+        Scenario("profile_doc", "GET", _get("/api/v1/profile/resume")),
+
+        Scenario("github_stats", "GET", _get(f"/api/v1/github/stats/{GITHUB_USER}")),
+        Scenario("github_repos", "GET", _get(f"/api/v1/github/repos/{GITHUB_USER}")),
+        Scenario("github_events", "GET", _get(f"/api/v1/github/events/{GITHUB_USER}")),
+        Scenario("leetcode_stats", "GET", _get(f"/api/v1/leetcode/stats/{LEETCODE_USER}")),
+        Scenario("leetcode_heatmap", "GET", _get(f"/api/v1/leetcode/heatmap/{LEETCODE_USER}")),
+        Scenario("leetcode_recent", "GET", _get(f"/api/v1/leetcode/recent/{LEETCODE_USER}")),
+        Scenario("leetcode_profile", "GET", _get(f"/api/v1/leetcode/profile/{LEETCODE_USER}")),
+
+        Scenario("cached_github_stats", "GET", _get(f"/api/v1/cached/github/stats/{GITHUB_USER}")),
+        Scenario("cached_github_repos", "GET", _get(f"/api/v1/cached/github/repos/{GITHUB_USER}")),
+        Scenario("cached_github_heatmap", "GET", _get(f"/api/v1/cached/github/heatmap/{GITHUB_USER}")),
+        Scenario("cached_github_heatmap_weekly", "GET", _get(f"/api/v1/cached/github/heatmap/{GITHUB_USER}?granularity=week")),
+        Scenario("cached_leetcode_stats", "GET", _get(f"/api/v1/cached/leetcode/stats/{LEETCODE_USER}")),
+        Scenario("cached_leetcode_heatmap", "GET", _get(f"/api/v1/cached/leetcode/heatmap/{LEETCODE_USER}")),
+        Scenario("cached_dashboard", "GET", _get("/api/v1/cached/dashboard")),
+        Scenario("cached_dashboard_gzip", "GET", lambda i, w: ("/api/v1/cached/dashboard", None, {"Accept-Encoding": "gzip"})),
+
+        Scenario("projects_list", "GET", _get("/api/v1/projects/?limit=20")),
+        Scenario("projects_next_page", "GET", _get(f"/api/v1/projects/?limit=20&cursor={first_project_page_cursor}")),
+        Scenario("projects_filtered", "GET", _get("/api/v1/projects/?tech_stack=Go&fields=title,tech_stack")),
+        Scenario("projects_featured", "GET", _get("/api/v1/projects/featured")),
+        Scenario("projects_get", "GET", lambda i, w: (f"/api/v1/projects/project-{i % SEED_PROJECTS}", None, {})),
+        Scenario("projects_export", "GET", _get("/api/v1/projects/export")),
+        Scenario("projects_create", "POST", lambda i, w: ("/api/v1/projects/", {**project, "title": f"bench new {i}"}, {})),
+        Scenario("projects_update", "PUT", lambda i, w: (f"/api/v1/projects/project-{i % SEED_PROJECTS}", project, {})),
+        Scenario("projects_bulk", "POST", lambda i, w: ("/api/v1/projects/bulk", bulk, {})),
+        Scenario("projects_delete", "DELETE", lambda i, w: (f"/api/v1/projects/bench-new-{i}", None, {})),
+
+        # New sessions with distinct questions: full generation every time
+        Scenario("chat_new_session", "POST", lambda i, w: (
+            "/api/v1/chat/query", {"message": f"What has Aryan built? ({i})"}, {}), chat=True),
+        # Same history-free question: served from the response cache after the first
+        Scenario("chat_repeated_question", "POST", lambda i, w: (
+            "/api/v1/chat/query", {"message": "Who is Aryan?"}, {}), chat=True),
+        # One ongoing conversation per worker: history comes from the hot-session cache
+        Scenario("chat_follow_up", "POST", lambda i, w: (
+            "/api/v1/chat/query", {"message": f"Tell me more ({i})", "session_id": f"bench-session-{w}"}, {}), chat=True),
+        Scenario("chat_sse", "POST", lambda i, w: (
+            "/api/v1/chat/query?transport=sse", {"message": f"Any SSE projects? ({i})"}, {}), chat=True),
+        Scenario("chat_history", "GET", lambda i, w: (f"/api/v1/chat/history/bench-session-{w}", None, {})),
+        Scenario("chat_metrics", "GET", _get("/api/v1/chat/metrics")),
+    ]
+
+async def asgi_request(app, method: str, path: str, body: Any = None, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Sends one request straight to the ASGI app and times it. Unlike
+    httpx.ASGITransport this sees each body chunk as it is sent, so
+    streaming responses get a real time-to-first-chunk.
+    """
+    path, _, query = path.partition("?")
+    payload = json.dumps(body).encode("utf-8") if body is not None else b""
+    raw_headers = [(b"host", b"bench")]
+    if body is not None:
+        raw_headers += [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())]
+    raw_headers += [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": raw_headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    finished = asyncio.Event()
+    request_sent = False
+    result: Dict[str, Any] = {"status": None, "bytes": 0, "first_byte_ms": None, "first_text_ms": None}
+    start = time.perf_counter()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        # The client stays connected until the response is complete
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        elapsed = (time.perf_counter() - start) * 1000
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            if chunk:
+                result["bytes"] += len(chunk)
+                if result["first_byte_ms"] is None:
+                    result["first_byte_ms"] = elapsed
+                if result["first_text_ms"] is None and b'"text"' in chunk:
+                    result["first_text_ms"] = elapsed
+            if not message.get("more_body", False):
+                finished.set()
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        finished.set()
+    result["latency_ms"] = (time.perf_counter() - start) * 1000
+    return result
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * p / 100))], 2)
+
+async def run_scenario(app, scenario: Scenario, total: int, concurrency: int) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+    next_index = iter(range(total))
+
+    async def worker(worker_id: int):
+        for i in next_index:
+            path, body, headers = scenario.build(i, worker_id)
+            results.append(await asgi_request(app, scenario.method, path, body, headers))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    latencies = [r["latency_ms"] for r in results]
+    statuses = Counter(str(r["status"]) for r in results)
+    report = {
+        "requests": len(results),
+        "concurrency": concurrency,
+        "throughput_rps": round(len(results) / wall, 1) if wall else None,
+        "latency_ms": {f"p{p}": percentile(latencies, p) for p in (50, 95, 99)},
+        "errors": sum(1 for r in results if not r["status"] or r["status"] >= 400),
+        "statuses": dict(statuses),
+        "mean_bytes": round(sum(r["bytes"] for r in results) / len(results)) if results else 0,
+    }
+    if scenario.chat:
+        ttfc = [r["first_text_ms"] for r in results if r["first_text_ms"] is not None]
+        report["ttfc_ms"] = {f"p{p}": percentile(ttfc, p) for p in (50, 95, 99)}
+    return report
+
+async def seed(db) -> str:
+    """Fill the in-memory database; returns the cursor for the second projects page."""
+    import sync_portfolio_data as sync
+    from app.api.projects import encode_cursor
+
+    semaphore = asyncio.Semaphore(4)
+    targets = [("github", GITHUB_USER), ("github_heatmap", GITHUB_USER), ("leetcode", LEETCODE_USER)]
+    results = await asyncio.gather(*(sync.run_target(s, u, semaphore) for s, u in targets))
+    failed = [r for r in results if r["error"]]
+    if failed:
+        raise RuntimeError(f"Seeding failed: {failed}")
+    await sync.write_results(db, results)
+
+    now = datetime.now()
+    languages = ["Python", "TypeScript", "Go", "Rust", "React", "FastAPI"]
+    projects = db["projects"]
+    for n in range(SEED_PROJECTS):
+        await projects.insert_one({
+            "project_id": f"project-{n}",
+            "title": f"Project {n}",
+            "image_url": None,
+            "description": f"Synthetic project {n} " + "for load testing " * 10,
+            "github_link": f"https://github.com/{GITHUB_USER}/project-{n}",
+            "deployed_link": None,
+            "tech_stack": [languages[n % len(languages)], languages[(n * 7) % len(languages)]],
+            "featured": n % 25 == 0,
+            "created_at": now - timedelta(hours=n),
+            "updated_at": now - timedelta(hours=n),
+        })
+    # project-19 is the last item of the first 20-item page
+    return encode_cursor({"created_at": now - timedelta(hours=19), "project_id": "project-19"})
+
+def environment() -> Dict[str, Any]:
+    from importlib import metadata
+
+    packages = {}
+    for name in ("fastapi", "starlette", "motor", "pymongo", "httpx", "langchain-core", "numpy"):
+        try:
+            packages[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            packages[name] = None
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "cpu_count": os.cpu_count(),
+        "packages": packages,
+    }
+
+def calibrate(rounds: int = 5) -> float:
+    """Median ms for a fixed JSON + hashing workload: this machine's speed in one number."""
+    payload = [{"id": i, "text": "calibration " * 20, "tags": list(range(10))} for i in range(2000)]
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(5):
+            encoded = json.dumps(payload)
+            hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+            json.loads(encoded)
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(sorted(timings)[len(timings) // 2], 2)
+
+def machine_scale(report: Dict[str, Any], baseline: Dict[str, Any]) -> float:
+    """
+    How much slower this machine is than the baseline's. Never below 1: the
+    simulated delays don't get faster on a faster CPU, so only loosen.
+    """
+    old, new = baseline.get("calibration_ms"), report.get("calibration_ms")
+    return max(new / old, 1.0) if old and new else 1.0
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, min_delta_ms: float = 1.0) -> List[str]:
+    scale = machine_scale(report, baseline)
+    regressions = []
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        old_p95, new_p95 = previous["latency_ms"]["p95"], current["latency_ms"]["p95"]
+        if old_p95 and new_p95:
+            expected = old_p95 * scale
+            # Sub-millisecond routes jitter by more than any tolerance; require a real difference too
+            if new_p95 > expected * (1 + tolerance) and new_p95 - expected > min_delta_ms:
+                regressions.append(f"{name}: p95 {new_p95} ms, expected <= {round(expected * (1 + tolerance), 2)} (baseline {old_p95})")
+        old_rps, new_rps = previous["throughput_rps"], current["throughput_rps"]
+        if old_rps and new_rps:
+            expected = old_rps / scale
+            if new_rps < expected * (1 - tolerance):
+                regressions.append(f"{name}: throughput {new_rps} req/s, expected >= {round(expected * (1 - tolerance), 1)} (baseline {old_rps})")
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{name}: errors {previous['errors']} -> {current['errors']}")
+    return regressions
+
+def print_row(name: str, r: Dict[str, Any]) -> None:
+    lat = r["latency_ms"]
+    cells = [r["throughput_rps"], lat["p50"], lat["p95"], lat["p99"], r.get("ttfc_ms", {}).get("p50")]
+    print(f"{name:<32}" + "".join(f"{'-' if v is None else v:>9}" for v in cells) + f"{r['errors']:>7}")
+
+async def run(args) -> Dict[str, Any]:
+    import httpx
+    from benchmarks.fakes import patch_update_one
+
+    # Before the app modules bind pymongo.UpdateOne
+    patch_update_one()
+    from app.main import app
+    from app.database import db_instance, DB_NAME
+    from app.http_client import http_pool, GITHUB_API_URL, GITHUB_CONTRIBUTIONS_URL, LEETCODE_URL
+    from app.chat.llm_registry import LLMRegistry
+    from app.chat.response_cache import response_cache
+    from benchmarks.fakes import InMemoryMongoClient, upstream_transport, FakeStreamingChatModel, FakeEmbeddings
+
+    # Inject the stand-ins; the lifespan keeps whatever is already there
+    client = InMemoryMongoClient(latency_ms=args.mongo_latency_ms)
+    db_instance.client = client
+    db_instance.db = client[DB_NAME]
+    transport = upstream_transport(latency_ms=args.upstream_latency_ms)
+    for url in (GITHUB_API_URL, GITHUB_CONTRIBUTIONS_URL, LEETCODE_URL):
+        http_pool.clients[httpx.URL(url).host] = httpx.AsyncClient(transport=transport)
+    app.state.llm_registry = LLMRegistry(llm=FakeStreamingChatModel(
+        first_token_ms=args.llm_first_token_ms, token_ms=args.llm_token_ms,
+    ))
+    response_cache.embedder = FakeEmbeddings()
+
+    report: Dict[str, Any] = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment(),
+        "calibration_ms": calibrate(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("json", "baseline", "tolerance", "min_delta_ms")},
+        "scenarios": {},
+    }
+    quiet = io.StringIO()
+    async with app.router.lifespan_context(app):
+        with contextlib.redirect_stdout(quiet if not args.verbose else sys.stdout):
+            cursor = await seed(db_instance.db)
+        scenarios = build_scenarios(cursor)
+        if args.only:
+            scenarios = [s for s in scenarios if any(key in s.name for key in args.only.split(","))]
+
+        print(f"{'Scenario':<32}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'ttfc50':>9}{'errors':>7}")
+        for scenario in scenarios:
+            with contextlib.redirect_stdout(quiet if not args.verbose else sys.stdout):
+                # A few requests first so lazy caches don't skew the numbers
+                await run_scenario(app, scenario, min(args.warmup, args.requests), min(args.concurrency, args.warmup or 1))
+                result = await run_scenario(app, scenario, args.requests, args.concurrency)
+            report["scenarios"][scenario.name] = result
+            print_row(scenario.name, result)
+            quiet.seek(0)
+            quiet.truncate()
+    report["mongo_calls"] = client.calls
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the backend API")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per scenario")
+    parser.add_argument("--only", help="Comma-separated substrings of scenario names to run")
+    parser.add_argument("--mongo-latency-ms", type=float, default=1.0)
+    parser.add_argument("--upstream-latency-ms", type=float, default=80.0)
+    parser.add_argument("--llm-first-token-ms", type=float, default=300.0)
+    parser.add_argument("--llm-token-ms", type=float, default=15.0)
+    parser.add_argument("--json", help="Write the report to this file (e.g. benchmarks/baseline.json)")
+    parser.add_argument("--baseline", help="Compare against a previous --json report")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown before flagging")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore p95 slowdowns smaller than this")
+    parser.add_argument("--verbose", action="store_true", help="Show the app's own log output")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Report written to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        old_env, new_env = baseline.get("environment", {}), report["environment"]
+        changed = [k for k in ("python", "platform", "machine", "processor", "cpu_count") if old_env.get(k) != new_env.get(k)]
+        if changed:
+            print(f"\nBaseline was recorded on a different environment ({', '.join(changed)} differ)")
+        print(f"Calibration {report['calibration_ms']} ms vs baseline {baseline.get('calibration_ms')} ms; "
+              f"scaling baseline timings by {machine_scale(report, baseline):.2f}")
+        regressions = compare(report, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"\nRegressions against {args.baseline} (tolerance {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,501 @@
+"""
+Local stand-ins for the backend's external dependencies, used by
+benchmarks/api_load.py:
+
+  - InMemoryMongoClient: the subset of Motor the app uses (find_one, find
+    with sort/limit/to_list/async iteration, update_one/insert_one/delete_one,
+    bulk_write, create_index, admin ping), with optional per-call latency.
+    patch_update_one() swaps pymongo.UpdateOne for FakeUpdateOne so
+    bulk_write can read the operations it is given.
+  - upstream_transport(): an httpx.MockTransport answering the GitHub REST,
+    github-contributions and LeetCode GraphQL calls with canned data.
+  - FakeStreamingChatModel / FakeEmbeddings: deterministic LangChain models,
+    so chat can run without a Gemini key.
+"""
+import re
+import copy
+import json
+import math
+import base64
+import asyncio
+import hashlib
+import itertools
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# --- MongoDB ---
+
+_object_ids = itertools.count(1)
+
+def _get(doc: Dict[str, Any], path: str) -> Any:
+    value: Any = doc
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+def _compare(value: Any, op: str, arg: Any) -> bool:
+    if op == "$in":
+        if isinstance(value, list):
+            return any(v in arg for v in value)
+        return value in arg
+    if op == "$ne":
+        return value != arg
+    if op == "$exists":
+        return (value is not None) == bool(arg)
+    if value is None:
+        return False
+    if op == "$lt":
+        return value < arg
+    if op == "$lte":
+        return value <= arg
+    if op == "$gt":
+        return value > arg
+    if op == "$gte":
+        return value >= arg
+    raise AssertionError(f"Query operator {op} is not supported by the in-memory MongoDB; add it to fakes._compare")
+
+def matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+            continue
+        value = _get(doc, key)
+        if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+            if not all(_compare(value, op, arg) for op, arg in condition.items()):
+                return False
+        elif isinstance(value, list) and not isinstance(condition, list):
+            if condition not in value:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+def _copy_path(src: Dict[str, Any], dst: Dict[str, Any], parts: List[str]) -> None:
+    key = parts[0]
+    if key not in src:
+        return
+    if len(parts) == 1:
+        dst[key] = src[key]
+        return
+    value = src[key]
+    if isinstance(value, list):
+        items = dst.setdefault(key, [{} for _ in value])
+        for source_item, target_item in zip(value, items):
+            if isinstance(source_item, dict):
+                _copy_path(source_item, target_item, parts[1:])
+    elif isinstance(value, dict):
+        _copy_path(value, dst.setdefault(key, {}), parts[1:])
+
+def project(doc: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    slices = {k: v["$slice"] for k, v in fields.items() if isinstance(v, dict) and "$slice" in v}
+    includes = [k for k, v in fields.items() if not isinstance(v, dict) and v]
+    if includes:
+        result = {"_id": doc["_id"]} if "_id" in doc else {}
+        for path in includes + list(slices):
+            _copy_path(doc, result, path.split("."))
+    else:
+        result = doc
+        for key, value in fields.items():
+            if not isinstance(value, dict) and not value:
+                result.pop(key, None)
+    for key, n in slices.items():
+        if isinstance(result.get(key), list):
+            result[key] = result[key][n:] if n < 0 else result[key][:n]
+    if not projection.get("_id", 1):
+        result.pop("_id", None)
+    return result
+
+def _apply_update(doc: Dict[str, Any], update: Dict[str, Any], inserting: bool) -> None:
+    for key, value in update.get("$set", {}).items():
+        doc[key] = copy.deepcopy(value)
+    if inserting:
+        for key, value in update.get("$setOnInsert", {}).items():
+            doc[key] = copy.deepcopy(value)
+    for key, value in update.get("$push", {}).items():
+        items = doc.setdefault(key, [])
+        if isinstance(value, dict) and "$each" in value:
+            items.extend(copy.deepcopy(value["$each"]))
+            if "$slice" in value:
+                n = value["$slice"]
+                doc[key] = items[n:] if n < 0 else items[:n]
+        else:
+            items.append(copy.deepcopy(value))
+
+class FakeUpdateOne:
+    """pymongo.UpdateOne with its arguments kept in public fields."""
+
+    def __init__(self, filter: Dict[str, Any], update: Dict[str, Any], upsert: bool = False, **kwargs):
+        self.filter = filter
+        self.update = update
+        self.upsert = upsert
+
+def patch_update_one() -> None:
+    """Have the app build FakeUpdateOne wherever it uses pymongo.UpdateOne."""
+    import sys
+    import pymongo
+
+    pymongo.UpdateOne = FakeUpdateOne
+    # Modules that already did `from pymongo import UpdateOne`
+    for name in ("app.api.projects", "sync_portfolio_data"):
+        module = sys.modules.get(name)
+        if module is not None:
+            module.UpdateOne = FakeUpdateOne
+
+class FakeCursor:
+    def __init__(self, collection: "InMemoryCollection", query: Dict[str, Any], projection: Optional[Dict[str, Any]]):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort: List[tuple] = []
+        self._limit = 0
+        self._skip = 0
+
+    def sort(self, key, direction: Optional[int] = None) -> "FakeCursor":
+        self._sort = list(key) if isinstance(key, list) else [(key, direction or 1)]
+        return self
+
+    def limit(self, n: int) -> "FakeCursor":
+        self._limit = n
+        return self
+
+    def skip(self, n: int) -> "FakeCursor":
+        self._skip = n
+        return self
+
+    def batch_size(self, n: int) -> "FakeCursor":
+        return self
+
+    async def _results(self) -> List[Dict[str, Any]]:
+        await self._collection.client.round_trip()
+        docs = [d for d in self._collection.docs if matches(d, self._query)]
+        for key, direction in reversed(self._sort):
+            docs.sort(key=lambda d: (_get(d, key) is not None, _get(d, key)), reverse=direction < 0)
+        docs = docs[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        return [project(d, self._projection) for d in docs]
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        docs = await self._results()
+        return docs[:length] if length else docs
+
+    async def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        for doc in await self._results():
+            yield doc
+
+class InMemoryCollection:
+    def __init__(self, client: "InMemoryMongoClient", name: str):
+        self.client = client
+        self.name = name
+        self.docs: List[Dict[str, Any]] = []
+
+    def _find(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return next((d for d in self.docs if matches(d, query)), None)
+
+    def _update(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool) -> SimpleNamespace:
+        doc = self._find(query)
+        if doc is not None:
+            _apply_update(doc, update, inserting=False)
+            return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+        if not upsert:
+            return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+        doc = {"_id": next(_object_ids)}
+        doc.update({k: v for k, v in query.items() if not k.startswith("$") and not isinstance(v, dict)})
+        _apply_update(doc, update, inserting=True)
+        self.docs.append(doc)
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=doc["_id"])
+
+    async def find_one(self, query: Dict[str, Any], projection: Optional[Dict[str, Any]] = None):
+        await self.client.round_trip()
+        doc = self._find(query)
+        return project(doc, projection) if doc is not None else None
+
+    def find(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None) -> FakeCursor:
+        return FakeCursor(self, query or {}, projection)
+
+    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
+        await self.client.round_trip()
+        return self._update(query, update, upsert)
+
+    async def insert_one(self, doc: Dict[str, Any]):
+        await self.client.round_trip()
+        doc = {"_id": next(_object_ids), **copy.deepcopy(doc)}
+        self.docs.append(doc)
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    async def delete_one(self, query: Dict[str, Any]):
+        await self.client.round_trip()
+        doc = self._find(query)
+        if doc is None:
+            return SimpleNamespace(deleted_count=0)
+        self.docs.remove(doc)
+        return SimpleNamespace(deleted_count=1)
+
+    async def bulk_write(self, operations: List[Any], ordered: bool = True):
+        await self.client.round_trip()
+        upserted_ids, matched, modified = {}, 0, 0
+        for i, op in enumerate(operations):
+            assert isinstance(op, FakeUpdateOne), (
+                f"The in-memory MongoDB only accepts FakeUpdateOne in bulk_write, got {type(op).__name__}; "
+                "call patch_update_one() before importing the app"
+            )
+            result = self._update(op.filter, op.update, op.upsert)
+            matched += result.matched_count
+            modified += result.modified_count
+            if result.upserted_id is not None:
+                upserted_ids[i] = result.upserted_id
+        return SimpleNamespace(
+            upserted_ids=upserted_ids,
+            upserted_count=len(upserted_ids),
+            matched_count=matched,
+            modified_count=modified,
+        )
+
+    async def create_index(self, keys, **kwargs) -> str:
+        return str(keys)
+
+class InMemoryDatabase:
+    def __init__(self, client: "InMemoryMongoClient"):
+        self.client = client
+        self.collections: Dict[str, InMemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> InMemoryCollection:
+        if name not in self.collections:
+            self.collections[name] = InMemoryCollection(self.client, name)
+        return self.collections[name]
+
+class _Admin:
+    def __init__(self, client: "InMemoryMongoClient"):
+        self.client = client
+
+    async def command(self, name: str, *args, **kwargs) -> Dict[str, Any]:
+        await self.client.round_trip()
+        return {"ok": 1.0}
+
+class InMemoryMongoClient:
+    """Stands in for AsyncIOMotorClient; every call costs `latency_ms` of simulated network time."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.databases: Dict[str, InMemoryDatabase] = {}
+        self.admin = _Admin(self)
+        self.calls = 0
+
+    async def round_trip(self) -> None:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+    def __getitem__(self, name: str) -> InMemoryDatabase:
+        if name not in self.databases:
+            self.databases[name] = InMemoryDatabase(self)
+        return self.databases[name]
+
+    def close(self) -> None:
+        pass
+
+# --- Upstream HTTP ---
+
+def _github_user(username: str) -> Dict[str, Any]:
+    return {
+        "login": username,
+        "public_repos": 30,
+        "followers": 42,
+        "following": 7,
+        "bio": "Benchmark user",
+        "avatar_url": f"https://avatars.example/{username}",
+        "html_url": f"https://github.com/{username}",
+    }
+
+def _github_repos(username: str, count: int = 30) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": i,
+            "name": f"repo-{i}",
+            "full_name": f"{username}/repo-{i}",
+            "html_url": f"https://github.com/{username}/repo-{i}",
+            "description": f"Benchmark repository {i} " + "lorem ipsum " * 8,
+            "language": ("Python", "TypeScript", "Go")[i % 3],
+            "stargazers_count": (i * 7) % 50,
+            "forks_count": i % 5,
+            "updated_at": (datetime(2026, 1, 1) - timedelta(days=i)).isoformat() + "Z",
+        }
+        for i in range(count)
+    ]
+
+def _github_events(username: str, count: int = 30) -> List[Dict[str, Any]]:
+    return [
+        {"id": str(i), "type": "PushEvent", "repo": {"name": f"{username}/repo-{i % 5}"},
+         "created_at": (datetime(2026, 1, 1) - timedelta(hours=i)).isoformat() + "Z"}
+        for i in range(count)
+    ]
+
+def _contributions(days: int = 365) -> Dict[str, Any]:
+    today = date.today()
+    entries = []
+    for i in range(days):
+        day = today - timedelta(days=days - 1 - i)
+        count = (i * 37) % 9 if i % 6 else 0
+        entries.append({"date": day.isoformat(), "count": count, "level": min(count // 2, 4)})
+    return {"total": {str(today.year): sum(e["count"] for e in entries)}, "contributions": entries}
+
+def _submission_calendar(days: int = 365) -> str:
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    calendar = {}
+    for i in range(days):
+        if i % 3:
+            calendar[str(int((today - timedelta(days=i)).timestamp()))] = (i * 13) % 6 + 1
+    return json.dumps(calendar)
+
+def _leetcode_user(username: str) -> Dict[str, Any]:
+    return {
+        "username": username,
+        "submitStats": {"acSubmissionNum": [
+            {"difficulty": "All", "count": 300, "submissions": 520},
+            {"difficulty": "Easy", "count": 150, "submissions": 210},
+            {"difficulty": "Medium", "count": 120, "submissions": 240},
+            {"difficulty": "Hard", "count": 30, "submissions": 70},
+        ]},
+        "profile": {"ranking": 123456, "reputation": 10, "realName": "Bench", "aboutMe": "",
+                    "countryName": "India", "company": None, "school": None},
+        "submissionCalendar": _submission_calendar(),
+    }
+
+def _leetcode_recent(limit: int) -> List[Dict[str, Any]]:
+    now = int(datetime.now(timezone.utc).timestamp())
+    return [
+        {"id": str(i), "title": f"Problem {i}", "titleSlug": f"problem-{i}", "timestamp": str(now - i * 3600)}
+        for i in range(limit)
+    ]
+
+_BATCH_FIELD = re.compile(r"(\w+): (matchedUser|recentAcSubmissionList)\(username: \$username_(\d+)")
+
+def _leetcode_graphql(payload: Dict[str, Any]) -> Dict[str, Any]:
+    query = payload.get("query", "")
+    variables = payload.get("variables") or {}
+    if "batchedLeetCode" in query:
+        data = {}
+        for alias, root, index in _BATCH_FIELD.findall(query):
+            username = variables.get(f"username_{index}")
+            if root == "matchedUser":
+                data[alias] = _leetcode_user(username)
+            else:
+                data[alias] = _leetcode_recent(int(variables.get(f"limit_{index}", 15)))
+        return {"data": data}
+    if "recentAcSubmissionList" in query:
+        return {"data": {"recentAcSubmissionList": _leetcode_recent(int(variables.get("limit", 15)))}}
+    return {"data": {"matchedUser": _leetcode_user(variables.get("username"))}}
+
+def _github_readme(repo: str) -> Dict[str, Any]:
+    content = f"# {repo}\n\nBenchmark README.\n"
+    return {"content": base64.b64encode(content.encode("utf-8")).decode("ascii"), "encoding": "base64"}
+
+def upstream_transport(latency_ms: float = 0.0) -> httpx.MockTransport:
+    """
+    Canned GitHub / github-contributions / LeetCode responses after
+    `latency_ms` of simulated network time. GitHub responses carry an ETag
+    and honour If-None-Match, like the real API.
+    """
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency_ms / 1000)
+        host, path = request.url.host, request.url.path
+        parts = [p for p in path.split("/") if p]
+
+        if host == "api.github.com":
+            if parts[:1] == ["users"] and len(parts) == 2:
+                body = _github_user(parts[1])
+            elif parts[:1] == ["users"] and parts[2:] == ["repos"]:
+                body = _github_repos(parts[1])
+            elif parts[:1] == ["users"] and parts[2:] == ["events"]:
+                body = _github_events(parts[1], int(request.url.params.get("per_page", 30)))
+            elif parts[:1] == ["repos"] and parts[3:] == ["readme"]:
+                body = _github_readme(parts[2])
+            elif parts[:1] == ["repos"] and parts[3:5] == ["git", "trees"]:
+                body = {"tree": [{"path": "README.md", "type": "blob"}, {"path": "app/main.py", "type": "blob"}]}
+            else:
+                return httpx.Response(404, json={"message": "Not Found"})
+            etag = '"' + hashlib.sha1(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest() + '"'
+            if request.headers.get("if-none-match") == etag:
+                return httpx.Response(304, headers={"ETag": etag})
+            return httpx.Response(200, json=body, headers={"ETag": etag})
+
+        if host == "github-contributions-api.jogruber.de" and parts[:1] == ["v4"]:
+            return httpx.Response(200, json=_contributions())
+
+        if host == "leetcode.com" and path == "/graphql":
+            return httpx.Response(200, json=_leetcode_graphql(json.loads(request.content or b"{}")))
+
+        return httpx.Response(404, json={"message": f"No fake for {host}{path}"})
+
+    return httpx.MockTransport(handler)
+
+# --- LLM and embeddings ---
+
+DEFAULT_ANSWER = (
+    "Aryan is a software developer who builds full-stack projects with Python, FastAPI and Next.js. "
+    "His portfolio covers retrieval-augmented chat, data syncing from GitHub and LeetCode, and a number "
+    "of open-source repositories. He enjoys competitive programming and has solved hundreds of problems."
+)
+
+class FakeStreamingChatModel(BaseChatModel):
+    """Streams a fixed answer word by word after a fixed first-token delay."""
+
+    answer: str = DEFAULT_ANSWER
+    first_token_ms: float = 300.0
+    token_ms: float = 15.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answer))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep((self.first_token_ms + self.token_ms * len(self.answer.split())) / 1000)
+        return self._generate(messages, stop=stop)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.first_token_ms / 1000)
+        for token in re.findall(r"\S+\s*", self.answer):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+            await asyncio.sleep(self.token_ms / 1000)
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic bag-of-words hashing embeddings (unit length)."""
+
+    def __init__(self, dimensions: int = 64):
+        self.dimensions = dimensions
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for word in re.findall(r"\w+", text.lower()):
+            digest = hashlib.sha256(word.encode("utf-8")).digest()
+            vector[digest[0] % self.dimensions] += 1.0 if digest[1] % 2 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return self.embed_query(text)
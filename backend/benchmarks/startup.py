@@ -0,0 +1,110 @@
+"""
+Cold-start benchmark for the backend.
+
+Reports:
+  1. `python -X importtime -c "import app.main"`: total import time and the
+     slowest top-level packages.
+  2. Time from launching uvicorn to the first 200 from /health, over a few runs.
+
+Usage (from backend/):
+    python benchmarks/startup.py [--runs 3] [--port 8765] [--json startup.json]
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import subprocess
+import urllib.request
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def measure_import_time(top: int = 15) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import app.main failed:\n{proc.stderr[-2000:]}")
+
+    total_us = 0
+    by_package = defaultdict(int)
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        # Depth-1 entries are the direct imports; their cumulative times sum to the total
+        if len(indent) == 1:
+            total_us += int(cumulative_us)
+        by_package[module.split(".")[0]] += int(self_us)
+
+    slowest = sorted(by_package.items(), key=lambda item: -item[1])[:top]
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "top_packages_ms": {name: round(us / 1000, 1) for name, us in slowest},
+    }
+
+def measure_time_to_healthy(port: int, timeout: float = 60.0) -> float:
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError(f"/health not ready after {timeout}s")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure backend cold-start time")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    print("Measuring import time of app.main...")
+    imports = measure_import_time()
+    print(f"  Total: {imports['total_ms']} ms")
+    for name, ms in imports["top_packages_ms"].items():
+        print(f"    {name:<32}{ms:>10.1f} ms")
+
+    print(f"Measuring time to first healthy response ({args.runs} runs)...")
+    runs = []
+    for i in range(args.runs):
+        ms = measure_time_to_healthy(args.port)
+        runs.append(round(ms, 1))
+        print(f"  Run {i + 1}: {ms:.0f} ms")
+
+    report = {
+        "import": imports,
+        "time_to_healthy_ms": {"runs": runs, "min": min(runs), "max": max(runs)},
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
 import asyncio
 import os
 import sys
+import time
+from collections import defaultdict
 from datetime import datetime
+from typing import Dict, List, Tuple
+
+from pymongo import UpdateOne
 
 # Add backend to path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -9,161 +14,194 @@ if current_dir not in sys.path:
     sys.path.append(current_dir)
 
 from app.github.stats_fetcher import GitHubStatsFetcher
+from app.github.heatmap_fetcher import GitHubHeatmapFetcher
 from app.leetcode.graphql_client import LeetCodeClient
 from app.database import get_database
+from app.http_client import http_pool
+from app.heatmap import build_heatmap, daily_from_github, daily_from_leetcode
+
+# Comma-separated "source:username" pairs; sources are github, github_heatmap, leetcode
+DEFAULT_SYNC_TARGETS = "github:ar586,github_heatmap:ar586,leetcode:aryan_anand2006"
+SYNC_CONCURRENCY = int(os.getenv("SYNC_CONCURRENCY", "8"))
+
+# A sync function returns the writes it wants as (collection, operation) pairs
+WriteOps = List[Tuple[str, UpdateOne]]
+
+def load_sync_targets() -> List[Tuple[str, str]]:
+    """Parse SYNC_TARGETS into a list of (source, username) tuples."""
+    targets = []
+    for item in os.getenv("SYNC_TARGETS", DEFAULT_SYNC_TARGETS).split(","):
+        item = item.strip()
+        if not item:
+            continue
+        source, _, username = item.partition(":")
+        if source not in SYNC_SOURCES or not username:
+            print(f"  ! Ignoring invalid sync target '{item}'")
+            continue
+        targets.append((source, username))
+    return targets
 
-async def sync_github_data(username: str, db):
-    """Fetch and save GitHub data to MongoDB"""
-    print(f"[{datetime.now()}] Syncing GitHub data for {username}...")
-    
+def _upsert(collection: str, username: str, fields: dict) -> Tuple[str, UpdateOne]:
+    fields = {"username": username, **fields, "updated_at": datetime.now()}
+    return collection, UpdateOne({"username": username}, {"$set": fields}, upsert=True)
+
+async def sync_github_data(username: str) -> WriteOps:
+    """Fetch GitHub user stats and repositories"""
     fetcher = GitHubStatsFetcher()
-    
-    # Fetch user stats
-    stats = await fetcher.get_user_stats(username)
+    stats, repos = await asyncio.gather(fetcher.get_user_stats(username), fetcher.get_repos(username))
+
+    if "error" in stats and not repos:
+        raise RuntimeError(stats["error"])
+
+    ops = []
     if "error" not in stats:
-        # Save to github_stats collection
-        await db["github_stats"].update_one(
-            {"username": username},
-            {
-                "$set": {
-                    "username": username,
-                    "public_repos": stats.get("public_repos"),
-                    "followers": stats.get("followers"),
-                    "following": stats.get("following"),
-                    "bio": stats.get("bio"),
-                    "avatar_url": stats.get("avatar_url"),
-                    "html_url": stats.get("html_url"),
-                    "updated_at": datetime.now()
-                }
-            },
-            upsert=True
-        )
-        print(f"  ✓ Saved user stats: {stats.get('public_repos')} repos, {stats.get('followers')} followers")
-    
-    # Fetch repositories
-    repos = await fetcher.get_repos(username)
+        ops.append(_upsert("github_stats", username, {
+            "public_repos": stats.get("public_repos"),
+            "followers": stats.get("followers"),
+            "following": stats.get("following"),
+            "bio": stats.get("bio"),
+            "avatar_url": stats.get("avatar_url"),
+            "html_url": stats.get("html_url"),
+        }))
+        print(f"  ✓ [{username}] User stats: {stats.get('public_repos')} repos, {stats.get('followers')} followers")
+    else:
+        print(f"  ! [{username}] User stats failed: {stats['error']}")
+
     if repos:
-        # Save to github_repos collection
-        await db["github_repos"].update_one(
-            {"username": username},
-            {
-                "$set": {
-                    "username": username,
-                    "repos": repos,
-                    "updated_at": datetime.now()
-                }
-            },
-            upsert=True
-        )
-        print(f"  ✓ Saved {len(repos)} repositories")
-
-async def sync_leetcode_data(username: str, db):
-    """Fetch and save LeetCode data to MongoDB"""
-    print(f"[{datetime.now()}] Syncing LeetCode data for {username}...")
-    
+        ops.append(_upsert("github_repos", username, {"repos": repos}))
+        print(f"  ✓ [{username}] {len(repos)} repositories")
+    return ops
+
+async def sync_leetcode_data(username: str) -> WriteOps:
+    """Fetch LeetCode stats and submission calendar"""
+    # Stats and submission calendar come back from one batched GraphQL request
     client = LeetCodeClient()
-    stats = await client.get_user_stats(username)
-    
-    if stats and "error" not in stats:
-        submit_stats = stats.get("submitStats", {}).get("acSubmissionNum", [])
-        profile = stats.get("profile", {})
-        
-        # Parse submission stats
-        easy = medium = hard = total = 0
-        for stat in submit_stats:
-            difficulty = stat["difficulty"]
-            count = stat["count"]
-            if difficulty == "Easy":
-                easy = count
-            elif difficulty == "Medium":
-                medium = count
-            elif difficulty == "Hard":
-                hard = count
-            elif difficulty == "All":
-                total = count
-        
-        # Save to leetcode_stats collection
-        await db["leetcode_stats"].update_one(
-            {"username": username},
-            {
-                "$set": {
-                    "username": username,
-                    "total_solved": total,
-                    "easy_solved": easy,
-                    "medium_solved": medium,
-                    "hard_solved": hard,
-                    "ranking": profile.get("ranking"),
-                    "updated_at": datetime.now()
-                }
-            },
-            upsert=True
-        )
-        print(f"  ✓ Saved LeetCode stats: {total} problems solved (E:{easy}, M:{medium}, H:{hard})")
-
-async def sync_heatmap_data(db):
-    """Fetch and save heatmap data to MongoDB"""
-    print(f"[{datetime.now()}] Syncing heatmap data...")
-    
-    # GitHub heatmap
-    from app.github.heatmap_fetcher import GitHubHeatmapFetcher
-    gh_heatmap = GitHubHeatmapFetcher()
-    gh_data = await gh_heatmap.get_heatmap("ar586")
-    
-    if gh_data:
-        await db["github_heatmap"].update_one(
-            {"username": "ar586"},
-            {
-                "$set": {
-                    "username": "ar586",
-                    "data": gh_data,
-                    "updated_at": datetime.now()
-                }
-            },
-            upsert=True
-        )
-        print(f"  ✓ Saved GitHub heatmap data")
-    
-    # LeetCode heatmap
-    lc_client = LeetCodeClient()
-    lc_heatmap = await lc_client.get_submission_calendar("aryan_anand2006")
-    
-    if lc_heatmap:
-        await db["leetcode_heatmap"].update_one(
-            {"username": "aryan_anand2006"},
-            {
-                "$set": {
-                    "username": "aryan_anand2006",
-                    "data": lc_heatmap,
-                    "updated_at": datetime.now()
-                }
-            },
-            upsert=True
-        )
-        print(f"  ✓ Saved LeetCode heatmap data")
-
-async def generate_stats_markdown(db):
+    lc_profile = await client.get_profile(username)
+    if "error" in lc_profile:
+        raise RuntimeError(lc_profile["error"])
+
+    stats = lc_profile.get("stats", {})
+    submit_stats = stats.get("submitStats", {}).get("acSubmissionNum", [])
+    profile = stats.get("profile", {})
+
+    # Parse submission stats
+    easy = medium = hard = total = 0
+    for stat in submit_stats:
+        difficulty = stat["difficulty"]
+        count = stat["count"]
+        if difficulty == "Easy":
+            easy = count
+        elif difficulty == "Medium":
+            medium = count
+        elif difficulty == "Hard":
+            hard = count
+        elif difficulty == "All":
+            total = count
+
+    print(f"  ✓ [{username}] LeetCode stats: {total} problems solved (E:{easy}, M:{medium}, H:{hard})")
+    ops = [
+        _upsert("leetcode_stats", username, {
+            "total_solved": total,
+            "easy_solved": easy,
+            "medium_solved": medium,
+            "hard_solved": hard,
+            "ranking": profile.get("ranking"),
+        }),
+    ]
+    calendar = lc_profile["submissionCalendar"]
+    if calendar is None:
+        # Keep the stored heatmap rather than overwriting it with an empty one
+        print(f"  ✗ [{username}] LeetCode calendar unavailable, heatmap not updated: {lc_profile['errors']['calendar']}")
+        return ops
+    ops.append(_upsert("leetcode_heatmap", username, {
+        "data": {"submissionCalendar": calendar},
+        # Normalised day array + streaks/rollups for range queries
+        "heatmap": build_heatmap(daily_from_leetcode(calendar)),
+    }))
+    return ops
+
+async def sync_heatmap_data(username: str) -> WriteOps:
+    """Fetch GitHub heatmap data (LeetCode's comes from sync_leetcode_data)"""
+    gh_data = await GitHubHeatmapFetcher().get_heatmap(username)
+    if not gh_data:
+        raise RuntimeError("GitHub heatmap fetch failed")
+    print(f"  ✓ [{username}] GitHub heatmap data")
+    return [_upsert("github_heatmap", username, {
+        "data": gh_data,
+        # Normalised day array + streaks/rollups for range queries
+        "heatmap": build_heatmap(daily_from_github(gh_data)),
+    })]
+
+SYNC_SOURCES = {
+    "github": sync_github_data,
+    "github_heatmap": sync_heatmap_data,
+    "leetcode": sync_leetcode_data,
+}
+
+async def run_target(source: str, username: str, semaphore: asyncio.Semaphore) -> Dict:
+    """Run one target; failures are reported rather than raised so other targets continue."""
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            ops = await SYNC_SOURCES[source](username)
+            return {"source": source, "username": username, "ops": ops, "error": None,
+                    "duration": time.perf_counter() - start}
+        except Exception as e:
+            return {"source": source, "username": username, "ops": [], "error": str(e),
+                    "duration": time.perf_counter() - start}
+
+async def write_results(db, results: List[Dict]) -> List[str]:
+    """
+    Flush all collected upserts with one unordered bulk_write per collection.
+    Returns the collections whose write failed.
+    """
+    by_collection = defaultdict(list)
+    for result in results:
+        for collection, op in result["ops"]:
+            by_collection[collection].append(op)
+
+    collections = list(by_collection)
+    outcomes = await asyncio.gather(
+        *(db[c].bulk_write(by_collection[c], ordered=False) for c in collections),
+        return_exceptions=True,
+    )
+    failed = []
+    for collection, res in zip(collections, outcomes):
+        if isinstance(res, Exception):
+            failed.append(collection)
+            print(f"  ✗ {collection}: write failed ({res})")
+        else:
+            print(f"  ✓ {collection}: {res.upserted_count} inserted, {res.modified_count} updated")
+    return failed
+
+async def generate_stats_markdown(db, targets: List[Tuple[str, str]]):
     """Generate stats.md for vector store from MongoDB data"""
     print(f"[{datetime.now()}] Generating stats.md for vector store...")
-    
+
     data_dir = os.path.join(current_dir, "data")
     os.makedirs(data_dir, exist_ok=True)
     output_file = os.path.join(data_dir, "stats.md")
-    
+
+    github_user = next((u for s, u in targets if s == "github"), None)
+    leetcode_user = next((u for s, u in targets if s == "leetcode"), None)
+
     # Fetch from MongoDB
-    gh_stats = await db["github_stats"].find_one({"username": "ar586"})
-    lc_stats = await db["leetcode_stats"].find_one({"username": "aryan_anand2006"})
-    
+    gh_stats, lc_stats = await asyncio.gather(
+        db["github_stats"].find_one({"username": github_user}),
+        db["leetcode_stats"].find_one({"username": leetcode_user}),
+    )
+
     # Generate markdown
     content = f"# Live Development Statistics\n"
     content += f"*Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n\n"
-    
+
     if gh_stats:
         content += "## GitHub Activity\n"
         content += f"- **Username**: {gh_stats.get('username')}\n"
         content += f"- **Public Repositories**: {gh_stats.get('public_repos')}\n"
         content += f"- **Followers**: {gh_stats.get('followers')}\n"
         content += f"- **Bio**: {gh_stats.get('bio', 'No bio provided')}\n\n"
-    
+
     if lc_stats:
         content += "## LeetCode Problem Solving\n"
         content += f"- **Username**: {lc_stats.get('username')}\n"
@@ -172,29 +210,52 @@ async def generate_stats_markdown(db):
         content += f"- **Medium Solved**: {lc_stats.get('medium_solved')}\n"
         content += f"- **Hard Solved**: {lc_stats.get('hard_solved')}\n"
         content += f"- **Total Problems Solved**: {lc_stats.get('total_solved')}\n"
-    
+
     with open(output_file, "w", encoding="utf-8") as f:
         f.write(content)
-    
+
     print(f"  ✓ Generated {output_file}")
 
+def print_report(results: List[Dict], wall_time: float) -> None:
+    print(f"\n{'-'*60}")
+    print(f"{'Target':<40}{'Time':>8}  Status")
+    for r in sorted(results, key=lambda r: -r["duration"]):
+        status = "ok" if r["error"] is None else f"FAILED ({r['error']})"
+        print(f"{r['source'] + ':' + r['username']:<40}{r['duration']:>7.2f}s  {status}")
+    print(f"Wall time: {wall_time:.2f}s (sum of targets: {sum(r['duration'] for r in results):.2f}s)")
+    print(f"{'-'*60}")
+
 async def main():
     print(f"\n{'='*60}")
     print(f"Portfolio Data Sync - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*60}\n")
-    
+
     # Get database connection
     db = get_database()
-    
-    # Sync all data
-    await sync_github_data("ar586", db)
-    await sync_leetcode_data("aryan_anand2006", db)
-    # TODO: Implement heatmap sync later
-    await sync_heatmap_data(db)
-    await generate_stats_markdown(db)
-    
+    targets = load_sync_targets()
+    print(f"[{datetime.now()}] Syncing {len(targets)} targets (concurrency {SYNC_CONCURRENCY})...")
+
+    # Fetchers share one pooled client per upstream host
+    http_pool.start()
+    start = time.perf_counter()
+    results = None
+    try:
+        semaphore = asyncio.Semaphore(SYNC_CONCURRENCY)
+        results = await asyncio.gather(*(run_target(s, u, semaphore) for s, u in targets))
+        failed_writes = await write_results(db, results)
+        await generate_stats_markdown(db, targets)
+    finally:
+        await http_pool.close()
+        if results is not None:
+            print_report(results, time.perf_counter() - start)
+
+    failed = [r for r in results if r["error"] is not None]
+
     print(f"\n{'='*60}")
-    print(f"Sync completed successfully!")
+    if failed or failed_writes:
+        print(f"Sync completed with {len(failed)} failed target(s) and {len(failed_writes)} failed collection write(s).")
+    else:
+        print(f"Sync completed successfully!")
     print(f"{'='*60}\n")
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+"""
+Keyset pagination of GET /api/v1/projects/ against the in-memory MongoDB
+from benchmarks/fakes.py. Run from backend/: python -m pytest tests
+"""
+import os
+import sys
+import asyncio
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.fakes import InMemoryMongoClient
+from app.database import db_instance
+from app.api.projects import get_all_projects
+
+def seed(dated: int, legacy: int) -> None:
+    client = InMemoryMongoClient()
+    db_instance.client = client
+    db_instance.db = client["portfolio_test"]
+    now = datetime(2025, 1, 1)
+    projects = db_instance.db["projects"]
+
+    async def insert():
+        for n in range(dated):
+            await projects.insert_one({"project_id": f"p{n:02d}", "created_at": now - timedelta(hours=n)})
+        # Legacy documents: one without the field, the rest with an explicit null
+        for n in range(legacy):
+            doc = {"project_id": f"legacy{n:02d}"}
+            if n:
+                doc["created_at"] = None
+            await projects.insert_one(doc)
+
+    asyncio.run(insert())
+
+def fetch_all(limit: int):
+    pages, cursor = [], None
+    while True:
+        page = asyncio.run(get_all_projects(limit=limit, cursor=cursor, fields=None, tech_stack=None, featured=None))
+        pages.append([p["project_id"] for p in page["projects"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+def test_pages_cross_into_projects_without_created_at():
+    seed(dated=5, legacy=4)
+    pages = fetch_all(limit=2)
+    ids = [pid for page in pages for pid in page]
+    assert ids == ["p00", "p01", "p02", "p03", "p04", "legacy03", "legacy02", "legacy01", "legacy00"]
+    assert all(pages)
+
+def test_no_cursor_after_a_full_last_page():
+    seed(dated=4, legacy=2)
+    pages = fetch_all(limit=3)
+    assert pages == [["p00", "p01", "p02"], ["p03", "legacy01", "legacy00"]]
+
+def test_no_cursor_on_a_short_page():
+    seed(dated=2, legacy=0)
+    assert fetch_all(limit=5) == [["p00", "p01"]]
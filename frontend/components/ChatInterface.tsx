@@ -111,6 +111,18 @@ export default function ChatInterface() {
                 }),
             });
 
+            if (response.status === 429) {
+                // Admission control: every line is busy; the server says when to try again
+                const retryAfter = parseInt(response.headers.get('Retry-After') || '', 10);
+                const seconds = Number.isFinite(retryAfter) && retryAfter > 0 ? retryAfter : 5;
+                setMessages(prev => prev.map(msg =>
+                    msg.id === botMessageId
+                        ? { ...msg, content: `All lines are busy at the moment. Please try again in ${seconds} s.` }
+                        : msg
+                ));
+                return;
+            }
+
             if (!response.ok) {
                 throw new Error('Failed to get response');
             }
@@ -120,6 +132,7 @@ export default function ChatInterface() {
 
             const decoder = new TextDecoder();
             let accumulatedResponse = '';
+            let streamError: string | null = null;
 
             while (true) {
                 const { done, value } = await reader.read();
@@ -146,6 +159,11 @@ export default function ChatInterface() {
                                         : msg
                                 ));
                             }
+
+                            // The server ends the stream with an error frame when generation fails
+                            if (data.error) {
+                                streamError = data.error;
+                            }
                         } catch (e) {
                             console.error('Error parsing chunk:', e);
                         }
@@ -153,6 +171,16 @@ export default function ChatInterface() {
                 }
             }
 
+            if (streamError) {
+                if (!accumulatedResponse) throw new Error(streamError);
+                console.error('Chat stream error:', streamError);
+                setMessages(prev => prev.map(msg =>
+                    msg.id === botMessageId
+                        ? { ...msg, content: accumulatedResponse + "\n\n[Transmission interrupted. Please try your request again.]" }
+                        : msg
+                ));
+            }
+
         } catch (error) {
             console.error('Chat error:', error);
             setMessages(prev => prev.map(msg =>
@@ -45,13 +45,11 @@ export default function GitHub() {
     const [sortBy, setSortBy] = useState<'stars' | 'updated'>('stars');
 
     useEffect(() => {
-        Promise.all([
-            api.getGitHubStats(),
-            api.getGitHubRepos()
-        ])
-            .then(([statsRes, reposRes]) => {
-                setStats(statsRes.data);
-                let sortedRepos = reposRes.data.repos.sort((a: Repository, b: Repository) => b.stargazers_count - a.stargazers_count);
+        // Stats and repos in one request
+        api.getDashboard({ fields: 'github_stats,github_repos' })
+            .then(res => {
+                setStats(res.data.github_stats);
+                let sortedRepos = (res.data.github_repos?.repos || []).sort((a: Repository, b: Repository) => b.stargazers_count - a.stargazers_count);
 
                 const pinnedRepoIndex = sortedRepos.findIndex((r: Repository) => r.name.toLowerCase().includes('dastabbej'));
                 if (pinnedRepoIndex > -1) {
@@ -25,6 +25,10 @@ export const api = {
   getGitHubReposDirect: (username: string = 'ar586') =>
     axios.get(`${API_BASE_URL}/github/repos/${username}`),
 
+  // All cached GitHub + LeetCode stats in one request; pass fields to skip parts
+  getDashboard: (params: { github_username?: string; leetcode_username?: string; fields?: string; repo_fields?: string } = {}) =>
+    axios.get(`${API_BASE_URL}/cached/dashboard`, { params }),
+
   // LeetCode
   getLeetCodeStats: (username: string = 'aryan_anand2006') =>
     axios.get(`${API_BASE_URL}/cached/leetcode/stats/${username}`),